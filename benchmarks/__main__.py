@@ -0,0 +1,90 @@
+"""
+Run the SeeKnob benchmark suite.
+
+Usage (from the repository root):
+    python -m benchmarks                          # print JSON results
+    python -m benchmarks --output baseline.json   # save results
+    python -m benchmarks --compare baseline.json  # flag regressions (exit code 1)
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+
+from benchmarks.suite import BENCHMARKS
+
+def best_of(runs):
+    """Keep the best value of each metric across repeated runs."""
+    best = {}
+    for results in runs:
+        for name, result in results.items():
+            previous = best.get(name)
+            if previous is None:
+                best[name] = result
+            elif result["higher_is_better"] == (result["value"] > previous["value"]):
+                best[name] = result
+    return best
+
+def run(selected, repeat):
+    results = {}
+    for name in selected:
+        print(f"Running {name} benchmarks...", file=sys.stderr)
+        results.update(best_of(BENCHMARKS[name]() for _ in range(repeat)))
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")
+        },
+        "results": results
+    }
+
+def compare(current, baseline, threshold):
+    """
+    Compare two result sets.
+    :return: List of (metric, baseline value, current value, change) for regressions.
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        previous = baseline["results"].get(name)
+        if not previous or not previous["value"]:
+            continue
+        change = (result["value"] - previous["value"]) / previous["value"]
+        if result["higher_is_better"]:
+            change = -change
+        if change > threshold:
+            regressions.append((name, previous["value"], result["value"], change))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="SeeKnob benchmark suite.")
+    parser.add_argument("--only", action="append", choices=sorted(BENCHMARKS),
+                        help="Run only the given benchmark group (repeatable).")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Run each group this many times and keep the best values (default: 3).")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--compare", metavar="BASELINE", help="Compare against a saved result file.")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="Relative slowdown reported as a regression (default: 0.15).")
+    args = parser.parse_args()
+
+    current = run(args.only or list(BENCHMARKS), args.repeat)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=4)
+    else:
+        print(json.dumps(current, indent=4))
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        for name, before, after, change in regressions:
+            print(f"REGRESSION {name}: {before} -> {after} ({change:+.0%})", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print("No regressions.", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
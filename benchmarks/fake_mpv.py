@@ -0,0 +1,85 @@
+"""
+A stand-in for MPV's JSON IPC server, used by the benchmarks.
+It answers the commands SeeKnob sends and keeps a fake playback position.
+"""
+import json
+import os
+import socket
+import threading
+
+class FakeMPVServer:
+    def __init__(self, socket_path, duration=3600.0):
+        """
+        :param socket_path: Path of the UNIX socket to listen on.
+        :param duration: Reported duration of the fake video.
+        """
+        self.socket_path = socket_path
+        self.properties = {"time-pos": 0.0, "duration": duration, "pause": False}
+        self.commands_received = 0
+        self.server = None
+
+    def start(self):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(self.socket_path)
+        self.server.listen(64)
+        threading.Thread(target=self.accept_loop, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self.server:
+            self.server.close()
+            self.server = None
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def accept_loop(self):
+        while self.server:
+            try:
+                client, _ = self.server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self.handle_client, args=(client,), daemon=True).start()
+
+    def handle_client(self, client):
+        buffer = b""
+        with client:
+            while True:
+                try:
+                    chunk = client.recv(65536)
+                except OSError:
+                    return
+                if not chunk:
+                    return
+                buffer += chunk
+                *lines, buffer = buffer.split(b"\n")
+                replies = [self.handle_command(json.loads(line)) for line in lines if line.strip()]
+                if replies:
+                    try:
+                        client.sendall(b"".join((json.dumps(r) + "\n").encode("utf-8") for r in replies))
+                    except OSError:
+                        return
+
+    def handle_command(self, message):
+        """Apply a command and build the reply MPV would send."""
+        self.commands_received += 1
+        command = message.get("command", [])
+        reply = {"error": "success"}
+        if "request_id" in message:
+            reply["request_id"] = message["request_id"]
+
+        name = command[0] if command else None
+        if name == "get_property":
+            reply["data"] = self.properties.get(command[1])
+        elif name == "set_property":
+            self.properties[command[1]] = command[2]
+        elif name == "seek":
+            flags = command[2] if len(command) > 2 else "relative"
+            position = float(command[1])
+            if not flags.startswith("absolute"):
+                position += self.properties["time-pos"]
+            self.properties["time-pos"] = min(max(0.0, position), self.properties["duration"])
+        elif name == "cycle":
+            self.properties[command[1]] = not self.properties.get(command[1])
+        return reply
@@ -0,0 +1,133 @@
+"""
+Compare backward-seek latency between MPV performance profiles.
+
+Usage (from the repository root):
+    python -m benchmarks.seek_profiles [--config config.json] [--seeks 50]
+
+A long-GOP test clip is generated with ffmpeg, then every profile from the
+configuration is launched headless and timed on a series of backward knob
+seeks. Requires mpv and ffmpeg in PATH.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import tempfile
+import time
+
+from config.loader import load_config
+from ui.mpv_manager import MPVManager
+
+def generate_clip(path, duration=120, gop=300):
+    """Generate an H.264 test clip with one keyframe every `gop` frames."""
+    subprocess.run([
+        "ffmpeg", "-y", "-loglevel", "error",
+        "-f", "lavfi", "-i", f"testsrc2=size=1280x720:rate=30:duration={duration}",
+        "-c:v", "libx264", "-preset", "veryfast", "-g", str(gop),
+        "-keyint_min", str(gop), "-sc_threshold", "0", "-pix_fmt", "yuv420p",
+        path
+    ], check=True)
+
+class IPCClient:
+    """Minimal persistent MPV IPC connection that waits for events."""
+    def __init__(self, socket_path, timeout=10.0):
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                self.sock.connect(socket_path)
+                break
+            except OSError:
+                self.sock.close()
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.05)
+        self.sock.settimeout(timeout)
+        self.buffer = b""
+
+    def send(self, command):
+        self.sock.sendall((json.dumps({"command": command}) + "\n").encode("utf-8"))
+
+    def wait_event(self, name):
+        while True:
+            while b"\n" not in self.buffer:
+                chunk = self.sock.recv(65536)
+                if not chunk:
+                    raise ConnectionError("MPV closed the IPC socket")
+                self.buffer += chunk
+            line, self.buffer = self.buffer.split(b"\n", 1)
+            if json.loads(line).get("event") == name:
+                return
+
+    def close(self):
+        self.sock.close()
+
+def bench_profile(manager, name, clip, seeks, step, start):
+    """Return the latencies (in ms) of `seeks` backward seeks for one profile."""
+    socket_path = os.path.join(tempfile.gettempdir(), f"seeknob-bench-{os.getpid()}")
+    command = ["mpv", clip, f"--input-ipc-server={socket_path}", "--no-config",
+               "--vo=null", "--ao=null", "--pause", "--keep-open=yes",
+               f"--start={start}"]
+    command += [f"--{option}={value}" for option, value in manager.profile_options(name).items()]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    latencies = []
+    try:
+        client = IPCClient(socket_path)
+        client.wait_event("playback-restart")
+        # Jump (still paused) to the end of the scrub range. The demuxer has read
+        # ahead from 'start', so profiles with a seekable cache keep the range cached.
+        client.send(["seek", start + seeks * step, "absolute"])
+        client.wait_event("playback-restart")
+        for _ in range(seeks):
+            began = time.perf_counter()
+            # Exact for every profile, whatever its hr-seek setting, so the timings compare
+            client.send(["seek", -step, "relative+exact"])
+            client.wait_event("playback-restart")
+            latencies.append((time.perf_counter() - began) * 1000)
+        client.send(["quit"])
+        client.close()
+    finally:
+        process.wait(timeout=10)
+    return latencies
+
+def main():
+    parser = argparse.ArgumentParser(description="Backward-seek latency per MPV profile.")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--clip", help="Use an existing clip instead of generating one.")
+    parser.add_argument("--seeks", type=int, default=50)
+    parser.add_argument("--step", type=float, default=0.5)
+    parser.add_argument("--start", type=float, default=30.0)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    manager = MPVManager(None, None, False, 0,
+                         profiles=config.get("mpv_profiles"),
+                         ram_budget_mb=config.get("mpv_ram_budget_mb"))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        clip = args.clip
+        if not clip:
+            clip = os.path.join(tmp, "clip.mp4")
+            generate_clip(clip)
+
+        results = {}
+        for name in manager.profiles:
+            latencies = bench_profile(manager, name, clip, args.seeks, args.step, args.start)
+            results[name] = {
+                "median_ms": round(statistics.median(latencies), 2),
+                "p95_ms": round(sorted(latencies)[int(len(latencies) * 0.95) - 1], 2),
+                "max_ms": round(max(latencies), 2)
+            }
+
+    if args.json:
+        print(json.dumps(results, indent=4))
+    else:
+        print(f"{'profile':<14}{'median':>10}{'p95':>10}{'max':>10}")
+        for name, r in results.items():
+            print(f"{name:<14}{r['median_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['max_ms']:>10.2f}")
+
+if __name__ == "__main__":
+    main()
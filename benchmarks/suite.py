@@ -0,0 +1,181 @@
+"""
+Benchmarks for the SeeKnob hot paths.
+Each benchmark returns a dictionary of metrics:
+    {name: {"value": float, "unit": str, "higher_is_better": bool}}
+None of them need input devices or MPV.
+"""
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from evdev import InputEvent, ecodes
+
+from benchmarks.fake_mpv import FakeMPVServer
+from input.input_handler import InputHandler
+from ui.folder_browser import FolderBrowser
+from ui.mpv_manager import MPVManager
+
+KEY_MAPPINGS = {
+    "seek_forward": "knob_device.KEY_VOLUMEUP",
+    "seek_backward": "knob_device.KEY_VOLUMEDOWN",
+    "toggle_pause": "knob_device.KEY_PLAYPAUSE",
+    "decrease_seek_step": "buttons_device.KEY_1",
+    "increase_seek_step": "buttons_device.KEY_2",
+    "set_marker_1": "buttons_device.KEY_3",
+    "play_marker_1": "buttons_device.KEY_4",
+    "nav_up": "knob_device.KEY_VOLUMEDOWN",
+    "nav_down": "knob_device.KEY_VOLUMEUP",
+    "nav_select": "knob_device.KEY_PLAYPAUSE",
+    "nav_quit": "buttons_device.KEY_1"
+}
+
+def metric(value, unit, higher_is_better=False):
+    return {"value": round(value, 3), "unit": unit, "higher_is_better": higher_is_better}
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+class RunningProcess:
+    """Makes MPVManager.is_running() true without launching MPV."""
+    def poll(self):
+        return None
+
+class FakeMPVSession:
+    """An MPVManager connected to a FakeMPVServer in a temporary directory."""
+    def __init__(self, command_queue_size=64):
+        self.command_queue_size = command_queue_size
+
+    def __enter__(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        socket_path = os.path.join(self.tmp.name, "mpv-socket")
+        self.server = FakeMPVServer(socket_path).start()
+        self.manager = MPVManager(os.path.join(self.tmp.name, "clip.mp4"), socket_path, False, 0,
+                                  command_queue_size=self.command_queue_size)
+        self.manager.process = RunningProcess()
+        self.manager.start_ipc(self.manager.process)
+        self.manager.get_current_time(timeout=5)  # Wait until the connection is up
+        return self
+
+    def __exit__(self, *exc):
+        self.manager.process = None
+        self.server.stop()
+        self.tmp.cleanup()
+
+    def input_handler(self):
+        config = {
+            "devices": {},
+            "default_seek_step": 0.5,
+            "key_mappings": KEY_MAPPINGS,
+            "marker_persistence": "False",
+            "marker_storage_folder": os.path.join(self.tmp.name, "markers"),
+            "keyframe_index": "False",
+            "mpv_osd_messages": "False"
+        }
+        return InputHandler(self.manager, threading.Event(), config, loop=None)
+
+def bench_input_dispatch(events=2000):
+    """Time InputHandler dispatch of synthetic evdev events."""
+    results = {}
+    with FakeMPVSession() as session:
+        handler = session.input_handler()
+
+        # Slow knob turns (0.5 s apart): one relative seek per detent
+        samples = []
+        for i in range(events):
+            event = InputEvent(i // 2, (i % 2) * 500000, ecodes.EV_KEY, ecodes.KEY_VOLUMEUP, 1)
+            began = time.perf_counter()
+            handler.process_knob_event(event, "knob_device")
+            samples.append(time.perf_counter() - began)
+        results["input_knob_dispatch_median"] = metric(statistics.median(samples) * 1e6, "us")
+        results["input_knob_dispatch_p95"] = metric(percentile(samples, 0.95) * 1e6, "us")
+
+        # Ignored events (key releases and non-key events) should be almost free
+        release = InputEvent(0, 0, ecodes.EV_KEY, ecodes.KEY_VOLUMEUP, 0)
+        sync = InputEvent(0, 0, ecodes.EV_SYN, 0, 0)
+        began = time.perf_counter()
+        for _ in range(events):
+            handler.process_knob_event(release, "knob_device")
+            handler.process_knob_event(sync, "knob_device")
+        results["input_ignored_event"] = metric((time.perf_counter() - began) / (2 * events) * 1e6, "us")
+
+        # Button dispatch while MPV is running (seek step changes)
+        press = InputEvent(0, 0, ecodes.EV_KEY, ecodes.KEY_2, 1)
+        began = time.perf_counter()
+        for _ in range(events):
+            handler.process_button_event(press, "buttons_device")
+        results["input_button_dispatch"] = metric((time.perf_counter() - began) / events * 1e6, "us")
+    return results
+
+def bench_ipc(commands=2000, round_trips=500):
+    """Measure MPVManager command throughput and get_property round-trip latency."""
+    results = {}
+    # Room for the whole burst plus the final get_property, so no command is refused
+    with FakeMPVSession(command_queue_size=commands * 2) as session:
+        manager = session.manager
+        received = session.server.commands_received
+        began = time.perf_counter()
+        for _ in range(commands):
+            # Pause toggles are never merged in the queue, so each one reaches MPV
+            manager.toggle_pause()
+        submitted = time.perf_counter() - began
+        # The reply to a final command arrives after every earlier command was processed
+        manager.get_current_time(timeout=30)
+        elapsed = time.perf_counter() - began
+        delivered = session.server.commands_received - received - 1
+        if delivered != commands:
+            raise RuntimeError(f"{commands - delivered} of {commands} commands did not reach MPV")
+        results["ipc_submit_latency"] = metric(submitted / commands * 1e6, "us")
+        results["ipc_command_throughput"] = metric(delivered / elapsed, "cmd/s", higher_is_better=True)
+
+        samples = []
+        for _ in range(round_trips):
+            began = time.perf_counter()
+            manager.get_current_time()
+            samples.append(time.perf_counter() - began)
+        results["ipc_round_trip_median"] = metric(statistics.median(samples) * 1e6, "us")
+        results["ipc_round_trip_p95"] = metric(percentile(samples, 0.95) * 1e6, "us")
+    return results
+
+def bench_hashing(size_mb=256):
+    """Measure calculate_file_hash throughput on a generated file."""
+    with FakeMPVSession() as session:
+        handler = session.input_handler()
+        path = os.path.join(session.tmp.name, "large.bin")
+        block = os.urandom(1024 * 1024)
+        with open(path, "wb") as f:
+            for _ in range(size_mb):
+                f.write(block)
+
+        began = time.perf_counter()
+        file_hash = handler.calculate_file_hash(path)
+        elapsed = time.perf_counter() - began
+        if not file_hash:
+            raise RuntimeError("calculate_file_hash failed")
+    return {"hash_throughput": metric(size_mb / elapsed, "MiB/s", higher_is_better=True)}
+
+def bench_listing(files=5000, folders=200, repeats=5):
+    """Time FolderBrowser.update_file_list on a generated directory."""
+    with tempfile.TemporaryDirectory() as tmp:
+        extensions = ("mp4", "avi", "mkv", "txt", "jpg")
+        for i in range(files):
+            open(os.path.join(tmp, f"clip_{i:05d}.{extensions[i % len(extensions)]}"), "w").close()
+        for i in range(folders):
+            os.mkdir(os.path.join(tmp, f"folder_{i:04d}"))
+
+        browser = FolderBrowser(tmp, ["mp4", "avi"], False, on_file_selected=None, on_exit=None)
+        samples = []
+        for _ in range(repeats):
+            began = time.perf_counter()
+            browser.update_file_list()
+            samples.append(time.perf_counter() - began)
+    return {"listing_update_file_list": metric(statistics.median(samples) * 1000, "ms")}
+
+BENCHMARKS = {
+    "input": bench_input_dispatch,
+    "ipc": bench_ipc,
+    "hashing": bench_hashing,
+    "listing": bench_listing
+}
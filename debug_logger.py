@@ -1,19 +1,34 @@
 import os
+import threading
 
 class Debug:
     """A class for logging debug messages to a file."""
-    def __init__(self, log_file="debug.log"):
-        self.log_file = log_file
-        # Reset the log file (clear content) on app startup
-        with open(self.log_file, "w") as f:
-            f.write("=== Debug Log Initialized ===\n")
+    default_log_file = "debug.log"  # Used by loggers created without a log_file
+    reset_files = set()  # Log files already cleared by this process
+    reset_lock = threading.Lock()
+
+    def __init__(self, log_file=None):
+        self._log_file = log_file
+
+    @property
+    def log_file(self):
+        return self._log_file or Debug.default_log_file
+
+    def write(self, line):
+        log_file = self.log_file
+        with Debug.reset_lock:
+            if log_file not in Debug.reset_files:
+                Debug.reset_files.add(log_file)
+                # Reset the log file (clear content) on the first message of the process
+                with open(log_file, "w") as f:
+                    f.write("=== Debug Log Initialized ===\n")
+        with open(log_file, "a") as f:
+            f.write(line)
 
     def log(self, message):
         """Write a message to the debug log."""
-        with open(self.log_file, "a") as f:
-            f.write(f"{message}\n")
+        self.write(f"{message}\n")
 
     def log_exception(self, exception):
         """Log exceptions or errors."""
-        with open(self.log_file, "a") as f:
-            f.write(f"EXCEPTION: {exception}\n")
\ No newline at end of file
+        self.write(f"EXCEPTION: {exception}\n")
@@ -0,0 +1,219 @@
+import ctypes
+import errno
+import os
+import select
+import struct
+from evdev import InputDevice
+from debug_logger import Debug
+from metrics import metrics
+
+debug = Debug()
+
+# inotify(7) constants
+IN_ATTRIB = 0x00000004
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_ATTRIB | IN_DELETE_SELF | IN_MOVE_SELF
+EVENT_HEADER = struct.Struct("iIII")
+
+class Inotify:
+    """Minimal ctypes wrapper around the Linux inotify API."""
+    def __init__(self):
+        self.libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def add_watch(self, path, mask=WATCH_MASK):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for '{path}'")
+        return wd
+
+    def rm_watch(self, wd):
+        if self.libc.inotify_rm_watch(self.fd, wd) < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_rm_watch failed for watch {wd}")
+
+    def read_events(self):
+        """Return the pending events as (watch descriptor, mask, name) tuples."""
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0").decode(errors="replace")
+            offset += length
+            events.append((wd, mask, name))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+class DeviceManager:
+    """
+    Keep the configured input devices attached.
+    The folders holding the device paths (usually '/dev/input/by-id') are
+    watched with inotify: a device is opened again when its path reappears
+    and dropped when it vanishes or stops answering, without restarting.
+    """
+    def __init__(self, devices_config, stop_event, open_device=InputDevice):
+        """
+        :param devices_config: Mapping of device names to device paths.
+        :param stop_event: Event that stops the run loop.
+        :param open_device: Factory used to open a device path (evdev InputDevice by default).
+        """
+        self.paths = dict(devices_config)
+        self.stop_event = stop_event
+        self.open_device = open_device
+        self.devices = {}
+        self.handlers = {}
+        self.watches = {}  # watch descriptor -> watched folder
+        try:
+            self.inotify = Inotify()
+        except (OSError, AttributeError) as e:
+            debug.log_exception(f"inotify unavailable, device hotplug disabled: {e}")
+            self.inotify = None
+
+        for name in self.paths:
+            self.attach(name)
+        self.update_watches()
+
+    def set_handler(self, name, callback):
+        """Register callback(event, device_name) for the events of a device."""
+        self.handlers[name] = callback
+
+    def attach(self, name):
+        """Open a configured device. Returns True if it is attached afterwards."""
+        if name in self.devices:
+            return True
+        path = self.paths[name]
+        try:
+            self.devices[name] = self.open_device(path)
+            metrics.inc("seeknob_device_attach_total", device=name)
+            debug.log(f"Loaded device '{name}' at '{path}'")
+            return True
+        except Exception as e:
+            debug.log_exception(f"Failed to load device '{name}' at '{path}': {e}")
+            return False
+
+    def detach(self, name):
+        device = self.devices.pop(name, None)
+        if device:
+            try:
+                device.close()
+            except Exception:
+                pass
+            metrics.inc("seeknob_device_detach_total", device=name)
+            debug.log(f"Device '{name}' detached.")
+
+    def update_watches(self):
+        """
+        Watch the folder of every device path, or its nearest existing parent
+        when the folder itself does not exist yet (udev removes empty by-id folders).
+        Fallback watches on a parent are removed once the folder is back.
+        """
+        if not self.inotify:
+            return
+        wanted = set()
+        for path in self.paths.values():
+            folder = os.path.dirname(os.path.abspath(path))
+            while not os.path.isdir(folder) and folder != os.path.dirname(folder):
+                folder = os.path.dirname(folder)
+            wanted.add(folder)
+        for wd, folder in list(self.watches.items()):
+            if folder not in wanted:
+                del self.watches[wd]
+                try:
+                    self.inotify.rm_watch(wd)
+                except OSError as e:
+                    debug.log_exception(e)
+        for folder in wanted - set(self.watches.values()):
+            try:
+                self.watches[self.inotify.add_watch(folder)] = folder
+            except OSError as e:
+                debug.log_exception(e)
+
+    def handle_inotify(self):
+        """Attach or detach devices according to the folder changes."""
+        refresh = False
+        for wd, mask, name in self.inotify.read_events():
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                self.watches.pop(wd, None)
+                refresh = True
+                continue
+            folder = self.watches.get(wd)
+            if folder is None or not name:
+                continue
+            changed_path = os.path.join(folder, name)
+            if mask & IN_CREATE and os.path.isdir(changed_path):
+                refresh = True  # A missing parent folder of a device path appeared
+
+            for device_name, path in self.paths.items():
+                if os.path.abspath(path) != changed_path:
+                    continue
+                if mask & (IN_DELETE | IN_MOVED_FROM):
+                    self.detach(device_name)
+                elif mask & (IN_CREATE | IN_MOVED_TO):
+                    # The link may point to a new event node: reopen it
+                    self.detach(device_name)
+                    self.attach(device_name)
+                elif mask & IN_ATTRIB:
+                    self.attach(device_name)  # Retry after a permission change
+
+        if refresh:
+            self.update_watches()
+            for device_name in self.paths:
+                if device_name not in self.devices and os.path.exists(self.paths[device_name]):
+                    self.attach(device_name)
+
+    def run(self):
+        """Dispatch device events to the handlers until stop_event is set."""
+        while not self.stop_event.is_set():
+            fds = {device.fd: name for name, device in self.devices.items()}
+            watched = list(fds)
+            if self.inotify:
+                watched.append(self.inotify.fd)
+            r, _, _ = select.select(watched, [], [], 0.1)
+            for fd in r:
+                if self.inotify and fd == self.inotify.fd:
+                    self.handle_inotify()
+                    continue
+                name = fds[fd]
+                device = self.devices.get(name)
+                if device is None:
+                    continue  # Detached by an inotify event in this same round
+                try:
+                    for event in device.read():
+                        if self.stop_event.is_set():
+                            break
+                        metrics.inc("seeknob_input_events_total", device=name)
+                        handler = self.handlers.get(name)
+                        if handler:
+                            handler(event, name)
+                except OSError as e:
+                    if e.errno in (errno.ENODEV, errno.EIO, errno.EBADF):
+                        debug.log(f"Device '{name}' vanished.")
+                        self.detach(name)
+                    elif e.errno != errno.EAGAIN:
+                        debug.log_exception(e)
+                except Exception as e:
+                    debug.log_exception(e)
+
+    def close(self):
+        for name in list(self.devices):
+            self.detach(name)
+        if self.inotify:
+            self.inotify.close()
+            self.inotify = None
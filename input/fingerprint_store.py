@@ -0,0 +1,120 @@
+import fcntl
+import hashlib
+import json
+import os
+import threading
+from debug_logger import Debug
+
+debug = Debug()
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def calculate_file_hash(file_path):
+    """
+    Return the MD5 fingerprint of a file (used to name marker files).
+    Raises OSError if the file cannot be read.
+    """
+    hash_md5 = hashlib.md5()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            hash_md5.update(chunk)
+    return hash_md5.hexdigest()
+
+class FingerprintStore:
+    """
+    Persisted cache of file fingerprints, stored as 'fingerprints.json' in the
+    marker storage folder. An entry is valid while the file size and
+    modification time are unchanged. Several processes (the app and
+    tools.index) may share the file: saving merges the entries recorded here
+    into the ones already on disk.
+    """
+    def __init__(self, storage_folder):
+        """
+        :param storage_folder: Folder where the fingerprint cache is stored.
+        """
+        self.path = os.path.join(storage_folder, "fingerprints.json")
+        self.changed = {}  # Entries recorded since the last save
+        self.loaded_mtime_ns = None  # Modification time of the file when it was last read
+        self.lock = threading.Lock()
+        self.entries = self.read()
+
+    def read(self):
+        """Return the entries stored on disk."""
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r") as f:
+                self.loaded_mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+                return json.load(f)
+        except Exception as e:
+            debug.log_exception(e)
+            return {}
+
+    def save(self):
+        """
+        Merge the new entries into the cache file and write it atomically.
+        The file is re-read under an exclusive lock, so entries written by
+        another process since it was loaded are kept.
+        """
+        with self.lock:
+            if not self.changed:
+                return
+            tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(f"{self.path}.lock", "w") as lock_file:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                    entries = self.read()
+                    entries.update(self.changed)
+                    with open(tmp_path, "w") as f:
+                        json.dump(entries, f)
+                    os.replace(tmp_path, self.path)
+                    self.loaded_mtime_ns = os.stat(self.path).st_mtime_ns
+                self.entries = entries
+                self.changed = {}
+            except Exception as e:
+                debug.log_exception(e)
+
+    def get(self, file_path, stat=None):
+        """
+        Return the cached fingerprint of a file, or None if unknown or outdated.
+        :param stat: Result of os.stat for the file, if already available.
+        """
+        try:
+            stat = stat or os.stat(file_path)
+        except OSError:
+            return None
+        key = os.path.abspath(file_path)
+        entry = self.entries.get(key)
+        if not (entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns):
+            # Another process (e.g. tools.index) may have fingerprinted it since the last read
+            if not self.reload():
+                return None
+            entry = self.entries.get(key)
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return entry["hash"]
+        return None
+
+    def reload(self):
+        """Re-read the cache file if it changed on disk. Returns True if it was re-read."""
+        try:
+            if os.stat(self.path).st_mtime_ns == self.loaded_mtime_ns:
+                return False
+        except OSError:
+            return False
+        entries = self.read()
+        with self.lock:
+            entries.update(self.changed)  # Keep the entries not saved yet
+            self.entries = entries
+        return True
+
+    def put(self, file_path, file_hash, stat=None):
+        """Record the fingerprint of a file together with its size and mtime."""
+        try:
+            stat = stat or os.stat(file_path)
+        except OSError:
+            return
+        entry = {"hash": file_hash, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        with self.lock:
+            self.entries[os.path.abspath(file_path)] = entry
+            self.changed[os.path.abspath(file_path)] = entry
@@ -1,38 +1,65 @@
 import evdev
-from evdev import InputDevice, categorize, ecodes
-import select
+from evdev import categorize, ecodes
 import os
 import json
-import hashlib
+import threading
 from debug_logger import Debug
+from metrics import metrics
+from input.device_manager import DeviceManager
+from input.keyframe_index import KeyframeIndex
+from input.seek_acceleration import SeekAcceleration
+from input.fingerprint_store import FingerprintStore, calculate_file_hash
+from input.recent_files import RecentFiles
 
 debug = Debug()
 
 class InputHandler:
     def __init__(self, mpv_manager, stop_event, config, loop):
         self.mpv_manager = mpv_manager
-        self.devices = self.load_devices(config["devices"])
+        self.device_manager = DeviceManager(config["devices"], stop_event)
         self.seek_step = config["default_seek_step"]
+        # "fixed" uses seek_step for every detent, "adaptive" follows the acceleration curve
+        self.seek_step_mode = config.get("seek_step_mode", "fixed")
+        self.knob_speed = SeekAcceleration(
+            curve=config.get("seek_acceleration_curve"),
+            window=config.get("seek_acceleration_window", 4)
+        )
         self.marker_points = {}  # For dynamic markers
         self.marker_persistence = config.get("marker_persistence", "False").lower() == "true"
         self.marker_storage_folder = config.get("marker_storage_folder", "./markers")
         self.stop_event = stop_event
         self.keys = self.parse_key_mappings(config["key_mappings"])
         self.loop = loop
+        self.osd_messages = config.get("mpv_osd_messages", "True").lower() == "true"
+        self.status_listener = None  # Called when seek step, markers or profile change
+        self.current_file = None
+        self.file_hash = None
+        self.preloaded_markers = {}  # Marker data read ahead for the next playlist entry
+        self.hashing = {}  # file path -> Event set once the thread hashing it is done
+        self.hashing_lock = threading.Lock()
+
+        # Resume: the last position of each file is kept in the recent files (and its marker file)
+        self.resume_playback = config.get("resume_playback", "True").lower() == "true"
+        self.resume_checkpoint_interval = config.get("resume_checkpoint_interval", 10)
+        self.last_position = 0.0
+        self.marker_lock = threading.RLock()
+
+        # Fast-seek mode: keyframe seeks while the knob spins, one exact seek once it settles
+        self.fast_seek_interval = config.get("fast_seek_interval_ms", 60) / 1000
+        self.fast_seek_settle = config.get("fast_seek_settle_ms", 200) / 1000
+        self.keyframe_snap_tolerance = config.get("keyframe_snap_tolerance", 0.5)
+        self.keyframe_index = None
+        if config.get("keyframe_index", "True").lower() == "true":
+            self.keyframe_index = KeyframeIndex(self.marker_storage_folder)
+        self.scrub_target = None
+        self.last_keyframe_sent = None
+        self.settle_timer = None
+        self.scrub_lock = threading.Lock()
 
         if not os.path.exists(self.marker_storage_folder):
             os.makedirs(self.marker_storage_folder)
-
-    def load_devices(self, devices_config):
-        devices = {}
-        for name, path in devices_config.items():
-            try:
-                device = InputDevice(path)
-                devices[name] = device
-                debug.log(f"Loaded device '{name}' at '{path}'")
-            except Exception as e:
-                debug.log_exception(f"Failed to load device '{name}' at '{path}': {e}")
-        return devices
+        self.fingerprints = FingerprintStore(self.marker_storage_folder)
+        self.recent_files = RecentFiles(self.marker_storage_folder, config.get("recent_files_limit", 10))
 
     def parse_key_mappings(self, key_mappings):
         parsed_keys = {}
@@ -41,100 +68,186 @@ class InputHandler:
             parsed_keys[action] = (device_name, keycode)
         return parsed_keys
 
-    def handle_device_events(self, device_name, event_callback):
-        device = self.devices.get(device_name)
-        if not device:
-            debug.log(f"Device '{device_name}' not loaded.")
-            return
-        try:
-            debug.log(f"Listening to {device_name}: {device.path}")
-            while not self.stop_event.is_set():
-                r, _, _ = select.select([device.fd], [], [], 0.1)
-                if r:
-                    for event in device.read():
-                        if self.stop_event.is_set():
-                            break
-                        event_callback(event, device_name)
-        except Exception as e:
-            debug.log_exception(e)
+    def process_knob_event(self, event, device_name):
+        """Dispatch a knob event to MPV controls or menu navigation."""
+        if event.type == ecodes.EV_KEY:
+            key_event = categorize(event)
+            if key_event.keystate == 1:
+                for action, (dev, keycode) in self.keys.items():
+                    if device_name == dev and key_event.keycode == keycode:
+                        if self.mpv_manager.is_running():
+                            self.handle_mpv_controls(action, event.timestamp())
+                        else:
+                            self.handle_navigation_controls(action)
 
-    def handle_knob_events(self):
-        def process_event(event, device_name):
-            if event.type == ecodes.EV_KEY:
-                key_event = categorize(event)
-                if key_event.keystate == 1:
-                    for action, (dev, keycode) in self.keys.items():
-                        if device_name == dev and key_event.keycode == keycode:
-                            if self.mpv_manager.is_running():
-                                self.handle_mpv_controls(action)
-                            else:
-                                self.handle_navigation_controls(action)
-
-        self.handle_device_events("knob_device", process_event)
-
-    def handle_button_events(self):
-        """Handle button input events."""
-        def process_event(event, device_name):
-            if event.type == ecodes.EV_KEY:
-                key_event = categorize(event)
-                if key_event.keystate == 1:  # Key pressed
-                    for action, (dev, keycode) in self.keys.items():
-                        if device_name == dev and key_event.keycode == keycode:
-                            if self.mpv_manager.is_running():
-                                # Handle actions when MPV is running
-                                if action == "decrease_seek_step":
-                                    self.seek_step = max(0.1, round(self.seek_step - 0.1, 2))
-                                    self.mpv_manager.show_message(f"Seek Step: {self.seek_step:.2f}s", 3000)
-                                    debug.log(f"Decreased seek step to {self.seek_step:.2f} seconds.")
-                                elif action == "increase_seek_step":
-                                    self.seek_step = round(self.seek_step + 0.1, 2)
-                                    self.mpv_manager.show_message(f"Seek Step: {self.seek_step:.2f}s", 3000)
-                                    debug.log(f"Increased seek step to {self.seek_step:.2f} seconds.")
-                                elif action.startswith("set_marker"):
-                                    # Marker Set: Save the current time
-                                    marker_key = action.split("_")[2]
-                                    self.marker_points[marker_key] = self.mpv_manager.get_current_time()
-                                    self.mpv_manager.show_message(f"Marker {marker_key} Set: {self.marker_points[marker_key]:.2f}s", 3000)
-                                    debug.log(f"Set marker '{marker_key}' at {self.marker_points[marker_key]:.2f} seconds.")
-                                    if self.marker_persistence:
-                                        self.save_markers(self.mpv_manager.video_file)
-                                elif action.startswith("play_marker"):
-                                    # Marker Play: Seek to the saved marker
-                                    marker_key = action.split("_")[2]
-                                    if marker_key in self.marker_points:
-                                        self.mpv_manager.send_command({"command": ["seek", self.marker_points[marker_key], "absolute"]})
-                                        self.mpv_manager.show_message(f"Playing Marker {marker_key}: {self.marker_points[marker_key]:.2f}s", 3000)
+    def process_button_event(self, event, device_name):
+        """Dispatch a button event to MPV controls or menu navigation."""
+        if event.type == ecodes.EV_KEY:
+            key_event = categorize(event)
+            if key_event.keystate == 1:  # Key pressed
+                for action, (dev, keycode) in self.keys.items():
+                    if device_name == dev and key_event.keycode == keycode:
+                        if self.mpv_manager.is_running():
+                            # Handle actions when MPV is running
+                            if action == "decrease_seek_step":
+                                self.seek_step = max(0.1, round(self.seek_step - 0.1, 2))
+                                self.notify(f"Seek Step: {self.seek_step:.2f}s")
+                                debug.log(f"Decreased seek step to {self.seek_step:.2f} seconds.")
+                            elif action == "increase_seek_step":
+                                self.seek_step = round(self.seek_step + 0.1, 2)
+                                self.notify(f"Seek Step: {self.seek_step:.2f}s")
+                                debug.log(f"Increased seek step to {self.seek_step:.2f} seconds.")
+                            elif action == "toggle_seek_mode":
+                                self.seek_step_mode = "fixed" if self.seek_step_mode == "adaptive" else "adaptive"
+                                self.notify(f"Seek Mode: {self.seek_step_mode}")
+                                debug.log(f"Seek step mode set to '{self.seek_step_mode}'.")
+                            elif action == "next_file":
+                                self.mpv_manager.playlist_next()
+                                debug.log("Skipping to the next file.")
+                            elif action == "prev_file":
+                                self.mpv_manager.playlist_prev()
+                                debug.log("Going back to the previous file.")
+                            elif action == "cycle_profile":
+                                profile = self.mpv_manager.cycle_profile()
+                                self.notify(f"Profile: {profile}")
+                                debug.log(f"Switched to profile '{profile}'.")
+                            elif action.startswith("set_marker"):
+                                # Marker Set: Save the current time
+                                self.set_marker(action.split("_")[2])
+                            elif action.startswith("play_marker"):
+                                # Marker Play: Seek to the saved marker
+                                marker_key = action.split("_")[2]
+                                with self.marker_lock:
+                                    if not self.file_loaded():
+                                        debug.log(f"Marker '{marker_key}' ignored while the next file loads.")
+                                    elif marker_key in self.marker_points:
+                                        self.play_marker(self.marker_points[marker_key])
+                                        self.notify(f"Playing Marker {marker_key}: {self.marker_points[marker_key]:.2f}s")
                                         debug.log(f"Playing marker '{marker_key}' at {self.marker_points[marker_key]:.2f} seconds.")
-                            else:
-                                # Handle actions when MPV is NOT running
-                                if action == "nav_quit":
-                                    debug.log("Nav Quit triggered: Sending 'q' to Urwid")
-                                    self.handle_navigation("q")
-                                elif action == "nav_up":
-                                    debug.log("Navigating Up")
-                                    self.handle_navigation("up")
-                                elif action == "nav_down":
-                                    debug.log("Navigating Down")
-                                    self.handle_navigation("down")
-                                elif action == "nav_select":
-                                    debug.log("Confirming Selection")
-                                    self.handle_navigation("enter")
-
-        self.handle_device_events("buttons_device", process_event)
-
-
-    def handle_mpv_controls(self, action):
-        """Handle MPV-specific controls when video is playing."""
-        if action == "seek_forward":
-            self.mpv_manager.seek(self.seek_step)
-            debug.log(f"Seek forward {self.seek_step:.2f} seconds.")
-        elif action == "seek_backward":
-            self.mpv_manager.seek(-self.seek_step)
-            debug.log(f"Seek backward {self.seek_step:.2f} seconds.")
+                        else:
+                            # Handle actions when MPV is NOT running
+                            if action == "nav_quit":
+                                debug.log("Nav Quit triggered: Sending 'q' to Urwid")
+                                self.handle_navigation("q")
+                            elif action == "nav_up":
+                                debug.log("Navigating Up")
+                                self.handle_navigation("up")
+                            elif action == "nav_down":
+                                debug.log("Navigating Down")
+                                self.handle_navigation("down")
+                            elif action == "nav_select":
+                                debug.log("Confirming Selection")
+                                self.handle_navigation("enter")
+
+    def file_loaded(self):
+        """Return True once the markers of the file MPV is playing are loaded (False during a playlist switch)."""
+        return self.current_file is not None and self.mpv_manager.playing_file == self.current_file
+
+    def set_marker(self, marker_key):
+        """Store the observed playback position as a marker of the current file."""
+        with self.marker_lock:
+            # Observed position: asking MPV would block input while it is busy
+            position = self.mpv_manager.properties.get("time-pos")
+            if not self.file_loaded() or position is None:
+                debug.log(f"Marker '{marker_key}' ignored while the next file loads.")
+                return
+            self.marker_points[marker_key] = position
+            if self.marker_persistence:
+                self.save_markers(self.current_file)
+        self.notify(f"Marker {marker_key} Set: {position:.2f}s")
+        debug.log(f"Set marker '{marker_key}' at {position:.2f} seconds.")
+
+    def notify(self, message):
+        """Report a state change: MPV OSD message (if enabled) and status panel refresh."""
+        if self.osd_messages:
+            self.mpv_manager.show_message(message, 3000)
+        if self.status_listener:
+            self.status_listener("input")
+
+    def handle_mpv_controls(self, action, timestamp=None):
+        """
+        Handle MPV-specific controls when video is playing.
+        :param action: The mapped action name.
+        :param timestamp: Time of the input event, used to detect fast knob spins.
+        """
+        if action in ("seek_forward", "seek_backward"):
+            direction = 1 if action == "seek_forward" else -1
+            interval = self.knob_speed.update(timestamp, direction)
+            step = self.seek_step
+            if self.seek_step_mode == "adaptive":
+                step = self.knob_speed.step(self.seek_step, interval)
+            self.knob_seek(direction * step, interval)
+            debug.log(f"Seek {'forward' if direction > 0 else 'backward'} {step:.2f} seconds.")
         elif action == "toggle_pause":
             self.mpv_manager.toggle_pause()
             debug.log("Play/Pause toggled.")
 
+    def knob_seek(self, amount, interval=None):
+        """
+        Seek by a knob detent.
+        While the knob spins faster than 'fast_seek_interval_ms' per detent, only
+        keyframe seeks are sent (skipping ones that land on the same keyframe).
+        A single exact seek follows once the knob has been still for 'fast_seek_settle_ms'.
+        :param amount: Seek distance in seconds.
+        :param interval: Mean time between recent detents in seconds (None if unknown).
+        """
+        fast = interval is not None and interval < self.fast_seek_interval
+
+        with self.scrub_lock:
+            if fast:
+                if self.scrub_target is None:
+                    self.scrub_target = self.mpv_manager.properties.get("time-pos") or 0
+                self.scrub_target = max(0, self.scrub_target + amount)
+                keyframe = self.keyframe_index.nearest(self.scrub_target) if self.keyframe_index else None
+                if keyframe is None:
+                    self.mpv_manager.seek_to(self.scrub_target, "keyframes")
+                elif keyframe != self.last_keyframe_sent:
+                    self.mpv_manager.seek_to(keyframe, "keyframes")
+                    self.last_keyframe_sent = keyframe
+                self.schedule_settle()
+            elif self.scrub_target is not None:
+                # Slowed down right after a spin: finish with an exact seek
+                self.cancel_settle()
+                self.mpv_manager.seek_to(max(0, self.scrub_target + amount), "exact")
+                self.scrub_target = None
+                self.last_keyframe_sent = None
+            else:
+                self.mpv_manager.seek(amount)
+
+    def schedule_settle(self):
+        """Restart the timer that sends the final exact seek."""
+        self.cancel_settle()
+        self.settle_timer = threading.Timer(self.fast_seek_settle, self.settle_seek)
+        self.settle_timer.daemon = True
+        self.settle_timer.start()
+
+    def cancel_settle(self):
+        if self.settle_timer:
+            self.settle_timer.cancel()
+            self.settle_timer = None
+
+    def settle_seek(self):
+        """Send one exact seek to the position reached during a fast spin."""
+        with self.scrub_lock:
+            if self.scrub_target is None:
+                return
+            self.mpv_manager.seek_to(self.scrub_target, "exact")
+            debug.log(f"Knob settled, exact seek to {self.scrub_target:.2f} seconds.")
+            self.scrub_target = None
+            self.last_keyframe_sent = None
+            self.settle_timer = None
+
+    def play_marker(self, position):
+        """Seek to a marker, snapping to a nearby keyframe when one is within tolerance."""
+        keyframe = None
+        if self.keyframe_index and self.keyframe_snap_tolerance:
+            keyframe = self.keyframe_index.nearest(position, self.keyframe_snap_tolerance)
+        if keyframe is not None:
+            self.mpv_manager.seek_to(keyframe, "keyframes")
+            debug.log(f"Marker at {position:.2f}s snapped to keyframe {keyframe:.2f}s.")
+        else:
+            self.mpv_manager.seek_to(position, "exact")
+
     def handle_navigation_controls(self, action):
         """Handle navigation in the Urwid interface."""
         if action == "nav_up":
@@ -167,57 +280,188 @@ class InputHandler:
     def save_markers(self, video_file):
         if not self.marker_persistence or not video_file:
             return
-        file_hash = self.calculate_file_hash(video_file)
+        if video_file == self.current_file and self.file_hash:
+            file_hash = self.file_hash
+        else:
+            file_hash = self.calculate_file_hash(video_file)
         if not file_hash:
             return
         marker_file = os.path.join(self.marker_storage_folder, f"{file_hash}.marker")
-        data = {"file_name": os.path.basename(video_file), "markers": self.marker_points}
-        try:
-            with open(marker_file, "w") as f:
-                json.dump(data, f, indent=4)
-                debug.log(f"Saved markers: {data}")
-        except Exception as e:
-            debug.log_exception(e)
+        with self.marker_lock:
+            data = {
+                "file_name": os.path.basename(video_file),
+                "markers": self.marker_points,
+                "last_position": self.last_position
+            }
+            try:
+                with open(marker_file, "w") as f:
+                    json.dump(data, f, indent=4)
+                    debug.log(f"Saved markers: {data}")
+            except Exception as e:
+                debug.log_exception(e)
 
 
     def load_markers(self, video_file):
         """
         Load markers for the given video file from the stored marker file.
+        Also loads (or starts building) the keyframe index of the file and
+        moves it to the top of the recent files.
         :param video_file: Path to the video file.
         """
-        if not self.marker_persistence or not video_file:
+        if not video_file:
             return
 
-        file_hash = self.calculate_file_hash(video_file)
-        if not file_hash:
+        file_hash = None
+        if self.marker_persistence or self.keyframe_index:
+            file_hash = self.calculate_file_hash(video_file)
+        with self.marker_lock:
+            self.checkpoint_position()  # Flush the position of the previous file
+            self.current_file = video_file
+            self.file_hash = file_hash
+            # add() resets the stored position when the file changed since it was played
+            self.recent_files.add(video_file, file_hash)
+            recent = self.recent_files.get(video_file)
+            self.last_position = recent["position"] if recent else 0.0
+            if not file_hash:
+                if self.keyframe_index:
+                    self.keyframe_index.clear()  # Never snap to the keyframes of the previous file
+                return
+
+            if self.keyframe_index:
+                self.keyframe_index.load(video_file, file_hash)
+            if not self.marker_persistence:
+                return
+
+            marker_file = os.path.join(self.marker_storage_folder, f"{file_hash}.marker")
+            preloaded = self.preloaded_markers.pop(video_file, None)
+            if preloaded is not None:
+                self.marker_points = preloaded.get("markers", {})
+                self.last_position = preloaded.get("last_position", 0.0)
+                debug.log(f"Loaded preloaded markers for '{video_file}': {self.marker_points}")
+            elif os.path.exists(marker_file):
+                try:
+                    with open(marker_file, "r") as f:
+                        data = json.load(f)
+                        self.marker_points = data.get("markers", {})
+                        self.last_position = data.get("last_position", 0.0)
+                        debug.log(f"Loaded markers for '{video_file}': {self.marker_points}")
+                except Exception as e:
+                    debug.log_exception(e)
+            else:
+                debug.log(f"No marker file found for '{video_file}'. Initializing empty markers.")
+                self.marker_points = {}
+
+    def switch_file(self, video_file, previous=None):
+        """
+        Follow MPV to another playlist entry: save the position of the previous
+        file, load the markers of the new one and preload the one after it.
+        :param video_file: Path of the file MPV is now playing.
+        :param previous: Last properties of the file MPV left, with its 'path'.
+        """
+        self.cancel_settle()
+        self.scrub_target = None
+        if previous:
+            self.checkpoint_position(previous)
+        self.load_markers(video_file)
+        self.notify(os.path.basename(video_file))
+        self.preload_file(self.mpv_manager.next_file())
+
+    def preload_file(self, video_file):
+        """Fingerprint a file and read its marker file in the background."""
+        if not video_file or not (self.marker_persistence or self.keyframe_index):
             return
 
-        marker_file = os.path.join(self.marker_storage_folder, f"{file_hash}.marker")
-        if os.path.exists(marker_file):
+        def preload():
+            file_hash = self.calculate_file_hash(video_file)
+            marker_file = os.path.join(self.marker_storage_folder, f"{file_hash}.marker")
+            if file_hash and os.path.exists(marker_file):
+                try:
+                    with open(marker_file, "r") as f:
+                        self.preloaded_markers[video_file] = json.load(f)
+                except Exception as e:
+                    debug.log_exception(e)
+            debug.log(f"Preloaded '{video_file}'.")
+
+        threading.Thread(target=preload, daemon=True).start()
+
+    def resume_position(self):
+        """Return the position to resume the current file from, or None to start at the beginning."""
+        if self.resume_playback and self.last_position > 0:
+            return self.last_position
+        return None
+
+    def checkpoint_position(self, properties=None):
+        """
+        Save the playback position of the current file if it moved since the last save.
+        It goes to the recent files and, with marker persistence, to the marker file.
+        Positions near the end of the file are stored as 0 so the next play starts over.
+        :param properties: Properties of the file MPV left (with its 'path'), used instead
+                           of the live ones once MPV has moved to another file.
+        """
+        if not self.resume_playback or not self.current_file:
+            return
+        if properties is None:
+            properties = dict(self.mpv_manager.properties, path=self.mpv_manager.playing_file)
+        if properties.get("path") != self.current_file:
+            return
+        position = properties.get("time-pos")
+        if position is None:
+            return
+        duration = properties.get("duration")
+        if duration and position > duration - 5:
+            position = 0.0
+        with self.marker_lock:
+            if abs(position - self.last_position) < 1:
+                return
+            self.last_position = position
+            self.recent_files.update_position(self.current_file, position)
+            if self.marker_persistence:
+                self.save_markers(self.current_file)
+
+    def checkpoint_loop(self):
+        """Periodically save the playback position (batched instead of on every tick)."""
+        while not self.stop_event.wait(self.resume_checkpoint_interval):
             try:
-                with open(marker_file, "r") as f:
-                    data = json.load(f)
-                    self.marker_points = data.get("markers", {})
-                    debug.log(f"Loaded markers for '{video_file}': {self.marker_points}")
+                self.checkpoint_position()
             except Exception as e:
                 debug.log_exception(e)
-        else:
-            debug.log(f"No marker file found for '{video_file}'. Initializing empty markers.")
-            self.marker_points = {}
 
 
     def calculate_file_hash(self, file_path):
-        hash_md5 = hashlib.md5()
+        """
+        Return the file fingerprint, from the fingerprint cache when it is still valid.
+        A file is hashed by one thread at a time: others (e.g. a file switch racing
+        the preload) wait for its result.
+        """
         try:
-            with open(file_path, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    hash_md5.update(chunk)
-            return hash_md5.hexdigest()
+            while True:
+                stat = os.stat(file_path)
+                file_hash = self.fingerprints.get(file_path, stat)
+                if file_hash:
+                    metrics.inc("seeknob_fingerprint_cache_hits_total")
+                    return file_hash
+                with self.hashing_lock:
+                    done = self.hashing.get(file_path)
+                    if done is None:
+                        self.hashing[file_path] = threading.Event()
+                        break
+                done.wait()
+
+            try:
+                with metrics.timer("seeknob_file_hash_seconds"):
+                    file_hash = calculate_file_hash(file_path)
+                self.fingerprints.put(file_path, file_hash, stat)
+                self.fingerprints.save()
+            finally:
+                with self.hashing_lock:
+                    self.hashing.pop(file_path).set()
+            return file_hash
         except Exception as e:
             debug.log_exception(e)
             return None
 
     def start(self):
-        import threading
-        threading.Thread(target=self.handle_knob_events, daemon=True).start()
-        threading.Thread(target=self.handle_button_events, daemon=True).start()
+        self.device_manager.set_handler("knob_device", self.process_knob_event)
+        self.device_manager.set_handler("buttons_device", self.process_button_event)
+        threading.Thread(target=self.device_manager.run, daemon=True).start()
+        threading.Thread(target=self.checkpoint_loop, daemon=True).start()
@@ -0,0 +1,128 @@
+import bisect
+import json
+import os
+import subprocess
+import threading
+from debug_logger import Debug
+
+debug = Debug()
+
+class KeyframeIndex:
+    """
+    Per-file index of video keyframe timestamps.
+    The index is built with ffprobe in a background thread and cached in the
+    marker storage folder as '<file_hash>.keyframes'.
+    """
+    def __init__(self, storage_folder):
+        """
+        :param storage_folder: Folder where the index files are cached.
+        """
+        self.storage_folder = storage_folder
+        self.file_hash = None
+        self.keyframes = []
+        self.building = set()  # Hashes of the files being scanned
+        self.ffprobe_missing = False
+        self.lock = threading.Lock()
+
+    def index_path(self, file_hash):
+        return os.path.join(self.storage_folder, f"{file_hash}.keyframes")
+
+    def load(self, video_file, file_hash):
+        """
+        Load the cached index for a file, or start building it in the background.
+        :param video_file: Path to the video file.
+        :param file_hash: Fingerprint of the video file.
+        """
+        with self.lock:
+            self.file_hash = file_hash
+            self.keyframes = []
+
+        index_file = self.index_path(file_hash)
+        if os.path.exists(index_file):
+            try:
+                with open(index_file, "r") as f:
+                    keyframes = json.load(f).get("keyframes", [])
+                with self.lock:
+                    if self.file_hash == file_hash:
+                        self.keyframes = keyframes
+                debug.log(f"Loaded {len(keyframes)} keyframes for '{video_file}'.")
+                return
+            except Exception as e:
+                debug.log_exception(e)
+
+        with self.lock:
+            if self.ffprobe_missing:
+                return
+            if file_hash in self.building:
+                return  # Already scanning, the result is applied if the file is still current
+            self.building.add(file_hash)
+        threading.Thread(target=self.build, args=(video_file, file_hash), daemon=True).start()
+
+    def build(self, video_file, file_hash):
+        """Scan the video packets with ffprobe and store the keyframe timestamps."""
+        keyframes = []
+        try:
+            keyframes = self.scan(video_file)
+            if keyframes is None:
+                self.ffprobe_missing = True
+                keyframes = []
+            else:
+                # An empty index is kept too, so files without keyframe timestamps are not rescanned
+                with open(self.index_path(file_hash), "w") as f:
+                    json.dump({"file_name": os.path.basename(video_file), "keyframes": keyframes}, f)
+        except Exception as e:
+            debug.log_exception(e)
+        finally:
+            with self.lock:
+                self.building.discard(file_hash)
+                if keyframes and self.file_hash == file_hash:
+                    self.keyframes = keyframes
+        if keyframes:
+            debug.log(f"Built keyframe index for '{video_file}': {len(keyframes)} keyframes.")
+
+    @staticmethod
+    def scan(video_file):
+        """Return the sorted keyframe timestamps of the first video stream, or None without ffprobe."""
+        command = [
+            "ffprobe", "-v", "error", "-select_streams", "v:0",
+            "-show_entries", "packet=pts_time,flags", "-of", "csv=p=0",
+            video_file
+        ]
+        try:
+            output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+        except FileNotFoundError:
+            debug.log("ffprobe not found, keyframe indexes are disabled.")
+            return None
+        except Exception as e:
+            debug.log_exception(f"Keyframe scan failed for '{video_file}': {e}")
+            return []
+
+        keyframes = []
+        for line in output.splitlines():
+            pts_time, _, flags = line.partition(",")
+            if "K" in flags and pts_time not in ("", "N/A"):
+                keyframes.append(float(pts_time))
+        return sorted(keyframes)
+
+    def clear(self):
+        """Forget the keyframes of the previous file."""
+        with self.lock:
+            self.file_hash = None
+            self.keyframes = []
+
+    def nearest(self, position, tolerance=None):
+        """
+        Return the keyframe closest to a position.
+        :param position: Time in seconds.
+        :param tolerance: Maximum distance in seconds, or None for no limit.
+        :return: Keyframe time, or None if the index is empty or no keyframe is close enough.
+        """
+        keyframes = self.keyframes
+        if not keyframes:
+            return None
+        i = bisect.bisect_left(keyframes, position)
+        candidates = keyframes[max(0, i - 1):i + 1]
+        keyframe = min(candidates, key=lambda k: abs(k - position))
+        if tolerance is not None and abs(keyframe - position) > tolerance:
+            return None
+        return keyframe
@@ -0,0 +1,106 @@
+import json
+import os
+import threading
+import time
+from debug_logger import Debug
+
+debug = Debug()
+
+class RecentFiles:
+    """
+    Most-recently-used index of played files, stored as 'recent.json' in the
+    marker storage folder. Each entry keeps the file fingerprint and last
+    position. Entries whose file disappeared or changed are pruned lazily,
+    with a stat, when the list is read.
+    """
+    def __init__(self, storage_folder, limit=10):
+        """
+        :param storage_folder: Folder where the index is stored.
+        :param limit: Maximum number of entries kept.
+        """
+        self.path = os.path.join(storage_folder, "recent.json")
+        self.limit = limit
+        self.entries = []
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                self.entries = json.load(f)
+        except Exception as e:
+            debug.log_exception(e)
+            self.entries = []
+
+    def save(self):
+        with self.lock:
+            data = json.dumps(self.entries, indent=4)
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            debug.log_exception(e)
+
+    def get(self, file_path):
+        """Return the entry of a file, or None."""
+        file_path = os.path.abspath(file_path)
+        with self.lock:
+            for entry in self.entries:
+                if entry["path"] == file_path:
+                    return dict(entry)
+        return None
+
+    def add(self, file_path, file_hash):
+        """Move a file to the top of the list, keeping its last position."""
+        file_path = os.path.abspath(file_path)
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return
+        with self.lock:
+            previous = next((e for e in self.entries if e["path"] == file_path), None)
+            position = previous["position"] if previous and previous["mtime_ns"] == stat.st_mtime_ns else 0.0
+            self.entries = [e for e in self.entries if e["path"] != file_path]
+            self.entries.insert(0, {
+                "path": file_path,
+                "hash": file_hash,
+                "position": position,
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "played_at": time.time()
+            })
+            del self.entries[self.limit:]
+        self.save()
+
+    def update_position(self, file_path, position):
+        """Record the last playback position of a listed file."""
+        file_path = os.path.abspath(file_path)
+        with self.lock:
+            entry = next((e for e in self.entries if e["path"] == file_path), None)
+            if not entry:
+                return
+            entry["position"] = position
+        self.save()
+
+    def valid_entries(self):
+        """Return the entries, most recent first, after dropping stale ones."""
+        with self.lock:
+            entries = list(self.entries)
+        valid = []
+        for entry in entries:
+            try:
+                stat = os.stat(entry["path"])
+            except OSError:
+                continue
+            if stat.st_size == entry["size"] and stat.st_mtime_ns == entry["mtime_ns"]:
+                valid.append(entry)
+        if len(valid) != len(entries):
+            debug.log(f"Pruned {len(entries) - len(valid)} stale recent entries.")
+            with self.lock:
+                self.entries = [e for e in self.entries if e in valid]
+            self.save()
+        return [dict(entry) for entry in valid]
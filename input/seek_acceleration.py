@@ -0,0 +1,63 @@
+from collections import deque
+
+# [interval between detents in ms, seek step in seconds], slowest first
+DEFAULT_CURVE = [[200, 0.0], [100, 2.0], [50, 10.0], [25, 30.0], [12, 90.0]]
+
+class SeekAcceleration:
+    """
+    Track the knob speed from the input event timestamps and map it to a seek step.
+    The speed is the mean interval between the last few detents; it resets when
+    the knob changes direction or rests longer than 'reset_after' seconds.
+    """
+    def __init__(self, curve=None, window=4, reset_after=0.5):
+        """
+        :param curve: List of [interval_ms, step_seconds] points, interpolated linearly.
+        :param window: Number of recent intervals averaged.
+        :param reset_after: Pause (seconds) after which the speed starts over.
+        """
+        self.curve = sorted(curve or DEFAULT_CURVE, key=lambda point: -point[0])
+        self.intervals = deque(maxlen=window)
+        self.reset_after = reset_after
+        self.last_time = None
+        self.last_direction = None
+
+    def update(self, timestamp, direction):
+        """
+        Record a detent.
+        :param timestamp: Event time in seconds (evdev event timestamp).
+        :param direction: 1 for forward, -1 for backward.
+        :return: Mean interval in seconds between recent detents, or None after a reset.
+        """
+        if timestamp is None:
+            return None
+        if self.last_time is None or direction != self.last_direction or timestamp - self.last_time > self.reset_after:
+            self.intervals.clear()
+        else:
+            self.intervals.append(timestamp - self.last_time)
+        self.last_time = timestamp
+        self.last_direction = direction
+        if not self.intervals:
+            return None
+        return sum(self.intervals) / len(self.intervals)
+
+    def step(self, base_step, interval):
+        """
+        Return the seek step for a detent.
+        :param base_step: The fixed seek step, used as the minimum (slow turns).
+        :param interval: Mean interval from update(), or None.
+        """
+        if interval is None:
+            return base_step
+        interval_ms = interval * 1000
+        curve = self.curve
+        if interval_ms >= curve[0][0]:
+            step = curve[0][1]
+        elif interval_ms <= curve[-1][0]:
+            step = curve[-1][1]
+        else:
+            for (slow_ms, slow_step), (fast_ms, fast_step) in zip(curve, curve[1:]):
+                if fast_ms <= interval_ms <= slow_ms:
+                    ratio = (slow_ms - interval_ms) / (slow_ms - fast_ms)
+                    step = slow_step + ratio * (fast_step - slow_step)
+                    break
+        return max(base_step, round(step, 2))
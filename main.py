@@ -12,18 +12,33 @@ from input.input_handler import InputHandler
 from config.loader import load_config
 from ui.help_page import HelpPage
 from ui.video_playing_page import VideoPlayingPage
+from ui.recent_page import RecentPage
 from debug_logger import Debug
+from metrics import metrics
 
 stop_event = threading.Event()
 debug = Debug()  # Initialize Debug logger
 
 def main():
     config = load_config("config.json")
+    if config.get("metrics_enabled", "False").lower() == "true":
+        metrics.enable()
+        if config.get("metrics_socket"):
+            try:
+                metrics.serve_socket(config["metrics_socket"])
+            except OSError as e:
+                debug.log_exception(f"Failed to serve metrics on '{config['metrics_socket']}': {e}")
+        if config.get("metrics_file"):
+            metrics.write_file_periodically(config["metrics_file"], config.get("metrics_file_interval", 15), stop_event)
     mpv_manager = MPVManager(
         video_file=None,
         socket_path=config["mpv_socket"],
         full_screen=config["mpv_full_screen"].lower() == "true",
-        fs_screen=int(config.get("mpv_fs_screen", "0"))
+        fs_screen=int(config.get("mpv_fs_screen", "0")),
+        profiles=config.get("mpv_profiles"),
+        profile=config.get("mpv_profile", "scrub"),
+        ram_budget_mb=config.get("mpv_ram_budget_mb"),
+        command_queue_size=config.get("mpv_command_queue_size", 64)
     )
 
     # Define callbacks for the menu and other screens
@@ -38,6 +53,21 @@ def main():
         browser_view = folder_browser.widget()
         loop.widget = browser_view
 
+    def on_recent():
+        """Show the recently played files."""
+        recent_page = RecentPage(
+            input_handler.recent_files.valid_entries(),
+            on_entry_selected=on_recent_selected,
+            on_exit_callback=switch_to_menu
+        )
+        loop.widget = recent_page
+
+    def on_recent_selected(entry):
+        """Play a recent file straight away, reusing its stored fingerprint."""
+        if entry["hash"] and not input_handler.fingerprints.get(entry["path"]):
+            input_handler.fingerprints.put(entry["path"], entry["hash"])
+        on_file_selected(entry["path"])
+
     def on_about():
         """Show the About page."""
         about_page = AboutPage(on_exit_callback=switch_to_menu)
@@ -47,7 +77,9 @@ def main():
         """Handle quitting the application."""
         debug.log("Quitting the application.")
         stop_event.set()  # Signal threads to stop
-        mpv_manager.quit_mpv()  # Quit MPV if running
+        input_handler.checkpoint_position()  # Remember where playback stopped
+        mpv_manager.quit_mpv(timeout=2)  # Quit MPV if running, before the process exits
+        metrics.close()
         try:
             raise urwid.ExitMainLoop()  # Exit Urwid main loop cleanly
         except urwid.ExitMainLoop:
@@ -63,10 +95,11 @@ def main():
         help_page = HelpPage(on_exit_callback=switch_to_menu)
         loop.widget = help_page
 
-    def on_file_selected(selected_file):
+    def on_file_selected(selected_file, playlist=None):
         """
         Callback when a video file is selected.
         Displays the VideoPlayingPage and starts MPV playback.
+        :param playlist: Files to play in sequence, starting with selected_file.
         """
         if selected_file:
             # Load markers for the video file
@@ -74,26 +107,40 @@ def main():
 
             # Start MPV player
             mpv_manager.video_file = selected_file
-            mpv_manager.start_mpv()
+            mpv_manager.playlist = playlist or []
+            mpv_manager.start_mpv(start=input_handler.resume_position())
+            input_handler.preload_file(mpv_manager.next_file())
 
             # Show the VideoPlayingPage
-            video_page = VideoPlayingPage(mpv_manager, on_exit_callback=switch_to_menu)
+            video_page = VideoPlayingPage(
+                mpv_manager,
+                on_exit_callback=switch_to_menu,
+                input_handler=input_handler,
+                loop=loop,
+                refresh_rate=config.get("status_refresh_rate", 10)
+            )
             loop.widget = video_page
             loop.screen.clear()
             loop.draw_screen()
 
+    def on_folder_selected(files):
+        """Play all video files of the current folder as a playlist."""
+        if files:
+            on_file_selected(files[0], playlist=files)
+
     def on_browser_exit():
         """Return to the main menu when exiting the file browser."""
         loop.widget = menu
 
     # Initialize UI components
-    menu = Menu(on_select_file, on_help, on_about, on_quit, mpv_manager=mpv_manager)
+    menu = Menu(on_select_file, on_help, on_about, on_quit, mpv_manager=mpv_manager, on_recent=on_recent)
     folder_browser = FolderBrowser(
         start_dir=config["filem_start_path"],
         ext_filters=config["filem_ext_filters"].split(","),
         show_hidden=config["filem_show_hidden"] == "True",
         on_file_selected=on_file_selected,
-        on_exit=switch_to_menu
+        on_exit=switch_to_menu,
+        on_folder_selected=on_folder_selected
     )
 
     palette = [
@@ -109,6 +156,7 @@ def main():
 
     # Initialize and start the InputHandler
     input_handler = InputHandler(mpv_manager, stop_event, config, loop)
+    mpv_manager.file_listener = input_handler.switch_file
     input_handler.start()
 
     # Run the Urwid MainLoop
@@ -0,0 +1,181 @@
+import os
+import socket
+import threading
+import time
+from debug_logger import Debug
+
+debug = Debug()
+
+# name -> (type, help) of every metric SeeKnob reports
+METRICS = {
+    "seeknob_input_events_total": ("counter", "Input events read, per device."),
+    "seeknob_device_attach_total": ("counter", "Input devices opened, per device."),
+    "seeknob_device_detach_total": ("counter", "Input devices lost or closed, per device."),
+    "seeknob_mpv_starts_total": ("counter", "MPV processes launched."),
+    "seeknob_mpv_running": ("gauge", "1 while an MPV process is connected."),
+    "seeknob_ipc_commands_total": ("counter", "Commands written to MPV."),
+    "seeknob_ipc_writes_total": ("counter", "Socket writes to MPV (one per batch)."),
+    "seeknob_ipc_dropped_total": ("counter", "Commands dropped because MPV was not running or the queue was full."),
+    "seeknob_ipc_failures_total": ("counter", "MPV IPC connection or write failures."),
+    "seeknob_file_hash_seconds": ("summary", "Time spent fingerprinting files."),
+    "seeknob_fingerprint_cache_hits_total": ("counter", "Fingerprints served from the fingerprint cache."),
+    "seeknob_directory_scan_seconds": ("summary", "Time spent listing directories in the file browser.")
+}
+
+class _NullTimer:
+    """Timer used while metrics are disabled."""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+NULL_TIMER = _NullTimer()
+
+class _Timer:
+    def __init__(self, registry, name, labels):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.observe(self.name, time.perf_counter() - self.started, **self.labels)
+        return False
+
+class Metrics:
+    """
+    Process-wide registry of counters, gauges and timers.
+    Every update returns immediately while the registry is disabled.
+    """
+    def __init__(self):
+        self.enabled = False
+        self.values = {}  # (name, labels) -> value, or [sum, count] for timers
+        self.lock = threading.Lock()
+        self.server = None
+
+    def enable(self):
+        self.enabled = True
+
+    def inc(self, name, value=1, **labels):
+        """Increase a counter."""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        """Set a gauge."""
+        if not self.enabled:
+            return
+        with self.lock:
+            self.values[(name, tuple(sorted(labels.items())))] = value
+
+    def observe(self, name, seconds, **labels):
+        """Record one duration of a timer."""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            total = self.values.setdefault(key, [0.0, 0])
+            total[0] += seconds
+            total[1] += 1
+
+    def timer(self, name, **labels):
+        """Context manager that records the duration of its block."""
+        if not self.enabled:
+            return NULL_TIMER
+        return _Timer(self, name, labels)
+
+    def render(self):
+        """Return all metrics in the Prometheus text exposition format."""
+        with self.lock:
+            values = {key: (list(value) if isinstance(value, list) else value) for key, value in self.values.items()}
+
+        lines = []
+        for name, (kind, help_text) in METRICS.items():
+            samples = [(labels, value) for (metric, labels), value in sorted(values.items()) if metric == name]
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ""
+                if labels:
+                    label_text = "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+                if kind == "summary":
+                    lines.append(f"{name}_sum{label_text} {value[0]:.6f}")
+                    lines.append(f"{name}_count{label_text} {value[1]}")
+                else:
+                    lines.append(f"{name}{label_text} {value}")
+        return "\n".join(lines) + "\n"
+
+    def serve_socket(self, socket_path):
+        """
+        Serve the metrics on a local UNIX socket.
+        HTTP clients (curl --unix-socket) get an HTTP response, raw clients
+        (socat) get the plain text.
+        """
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            server.bind(socket_path)
+            server.listen(4)
+        except OSError:
+            server.close()
+            raise
+        self.server = server
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        debug.log(f"Serving metrics on '{socket_path}'.")
+
+    def _accept_loop(self):
+        while self.server:
+            try:
+                client, _ = self.server.accept()
+            except OSError:
+                return
+            with client:
+                try:
+                    client.settimeout(0.2)
+                    try:
+                        request = client.recv(1024)
+                    except socket.timeout:
+                        request = b""
+                    body = self.render().encode("utf-8")
+                    if request.startswith(b"GET"):
+                        header = (
+                            "HTTP/1.0 200 OK\r\n"
+                            "Content-Type: text/plain; version=0.0.4\r\n"
+                            f"Content-Length: {len(body)}\r\n\r\n"
+                        )
+                        body = header.encode("utf-8") + body
+                    client.sendall(body)
+                except OSError as e:
+                    debug.log_exception(e)
+
+    def write_file_periodically(self, file_path, interval, stop_event):
+        """Write the metrics to a file every `interval` seconds until stop_event is set."""
+        def write_loop():
+            while not stop_event.wait(interval):
+                tmp_path = f"{file_path}.tmp"
+                try:
+                    with open(tmp_path, "w") as f:
+                        f.write(self.render())
+                    os.replace(tmp_path, file_path)
+                except OSError as e:
+                    debug.log_exception(e)
+
+        threading.Thread(target=write_loop, daemon=True).start()
+
+    def close(self):
+        if self.server:
+            path = self.server.getsockname()
+            self.server.close()
+            self.server = None
+            if path and os.path.exists(path):
+                os.unlink(path)
+
+metrics = Metrics()  # Process-wide registry
@@ -0,0 +1,70 @@
+import os
+import select
+import shutil
+import tempfile
+import threading
+import unittest
+
+from input.device_manager import DeviceManager
+
+class FakeDevice:
+    """Stands in for an evdev InputDevice opened on a path."""
+    def __init__(self, path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        self.path = path
+        self.read_fd, self.fd = os.pipe()
+
+    def read(self):
+        return []
+
+    def close(self):
+        os.close(self.read_fd)
+        os.close(self.fd)
+
+class DeviceManagerHotplugTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.by_id = os.path.join(self.root, "by-id")
+        self.path = os.path.join(self.by_id, "usb-knob-event-kbd")
+        os.mkdir(self.by_id)
+        open(self.path, "w").close()
+        self.manager = DeviceManager({"knob_device": self.path}, threading.Event(), open_device=FakeDevice)
+        if not self.manager.inotify:
+            self.skipTest("inotify unavailable")
+
+    def tearDown(self):
+        self.manager.close()
+        shutil.rmtree(self.root)
+
+    def process_events(self):
+        """Handle the pending inotify events, as the run loop would."""
+        while select.select([self.manager.inotify.fd], [], [], 0.2)[0]:
+            self.manager.handle_inotify()
+
+    def test_device_follows_its_path(self):
+        self.assertIn("knob_device", self.manager.devices)
+
+        os.unlink(self.path)
+        self.process_events()
+        self.assertNotIn("knob_device", self.manager.devices)
+
+        open(self.path, "w").close()
+        self.process_events()
+        self.assertIn("knob_device", self.manager.devices)
+
+    def test_folder_removed_and_recreated(self):
+        shutil.rmtree(self.by_id)
+        self.process_events()
+        self.assertNotIn("knob_device", self.manager.devices)
+        self.assertEqual(set(self.manager.watches.values()), {self.root})
+
+        os.mkdir(self.by_id)
+        open(self.path, "w").close()
+        self.process_events()
+        self.assertIn("knob_device", self.manager.devices)
+        # The fallback watch on the parent is dropped once by-id is back
+        self.assertEqual(set(self.manager.watches.values()), {self.by_id})
+
+if __name__ == "__main__":
+    unittest.main()
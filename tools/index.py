@@ -0,0 +1,116 @@
+"""
+Pre-fingerprint a video library so opening a file does not wait for hashing.
+
+Usage (from the repository root):
+    python -m tools.index <dir> [--jobs 4] [--keyframes]
+
+Files are selected with 'filem_ext_filters' and 'filem_show_hidden' from the
+configuration, hashed in a process pool and recorded in the fingerprint
+cache of 'marker_storage_folder' (the one InputHandler.load_markers uses).
+Progress is saved regularly; an interrupted run resumes where it stopped.
+It logs to its own file (--log), so it can run next to the app.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from config.loader import load_config
+from debug_logger import Debug
+from input.fingerprint_store import FingerprintStore, calculate_file_hash
+from input.keyframe_index import KeyframeIndex
+
+def find_videos(root, ext_filters, show_hidden):
+    """Yield the video files below root, filtered like the file browser."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        if not show_hidden:
+            dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+        for name in sorted(filenames):
+            if not show_hidden and name.startswith("."):
+                continue
+            if os.path.splitext(name)[1].lower()[1:] in ext_filters:
+                yield os.path.join(dirpath, name)
+
+def fingerprint(file_path, keyframes_folder=None):
+    """
+    Worker: hash one file and optionally build its keyframe index.
+    The file is stat'ed before hashing, so a file modified meanwhile gets an
+    entry that no longer matches and is hashed again on next use.
+    :return: (file_path, file_hash, os.stat result) or (file_path, None, error message).
+    """
+    try:
+        stat = os.stat(file_path)
+        file_hash = calculate_file_hash(file_path)
+    except OSError as e:
+        return file_path, None, str(e)
+    if keyframes_folder:
+        index = KeyframeIndex(keyframes_folder)
+        if not os.path.exists(index.index_path(file_hash)):
+            index.build(file_path, file_hash)
+    return file_path, file_hash, stat
+
+def main():
+    parser = argparse.ArgumentParser(description="Fingerprint a video library in the background.")
+    parser.add_argument("directory")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--jobs", type=int, default=min(4, os.cpu_count() or 1),
+                        help="Worker processes, i.e. files read concurrently (default: up to 4).")
+    parser.add_argument("--keyframes", action="store_true", help="Also build keyframe indexes (needs ffprobe).")
+    parser.add_argument("--checkpoint", type=int, default=25,
+                        help="Save the fingerprint cache every N files (default: 25).")
+    parser.add_argument("--log", default="index-debug.log",
+                        help="Debug log file, kept apart from the app's debug.log (default: index-debug.log).")
+    args = parser.parse_args()
+    Debug.default_log_file = args.log
+
+    config = load_config(args.config)
+    storage_folder = config.get("marker_storage_folder", "./markers")
+    ext_filters = [e.lower() for e in config["filem_ext_filters"].split(",")]
+    show_hidden = config.get("filem_show_hidden", "False") == "True"
+
+    store = FingerprintStore(storage_folder)
+    pending = [path for path in find_videos(args.directory, ext_filters, show_hidden) if not store.get(path)]
+    print(f"{len(pending)} files to fingerprint.", file=sys.stderr)
+
+    keyframes_folder = storage_folder if args.keyframes else None
+    done = failed = processed_bytes = 0
+    started = time.monotonic()
+    queue = iter(pending)
+    try:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            # Keep a bounded window of submitted files instead of queueing the whole library
+            running = set()
+            for path in queue:
+                running.add(pool.submit(fingerprint, path, keyframes_folder))
+                if len(running) >= args.jobs * 2:
+                    break
+            while running:
+                finished, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    path, file_hash, detail = future.result()
+                    if file_hash:
+                        store.put(path, file_hash, detail)
+                        processed_bytes += detail.st_size
+                        done += 1
+                    else:
+                        print(f"\nFailed: {path}: {detail}", file=sys.stderr)
+                        failed += 1
+                    if (done + failed) % args.checkpoint == 0:
+                        store.save()
+                    next_path = next(queue, None)
+                    if next_path:
+                        running.add(pool.submit(fingerprint, next_path, keyframes_folder))
+
+                elapsed = max(time.monotonic() - started, 1e-6)
+                print(f"\r[{done + failed}/{len(pending)}] {done / elapsed:.1f} files/s, "
+                      f"{processed_bytes / elapsed / 2**20:.1f} MiB/s", end="", file=sys.stderr)
+    except KeyboardInterrupt:
+        print("\nInterrupted, saving progress.", file=sys.stderr)
+    finally:
+        store.save()
+
+    print(f"\nFingerprinted {done} files ({failed} failed) in {time.monotonic() - started:.1f}s.", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
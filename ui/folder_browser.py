@@ -1,6 +1,7 @@
 import os
 import urwid
 from debug_logger import Debug
+from metrics import metrics
 
 debug = Debug()  # Initialize Debug logger
 
@@ -10,13 +11,21 @@ class SelectableText(urwid.Text):
     def keypress(self, size, key):
         return key
 
+PLAY_FOLDER_LABEL = "[Play folder]"
+
 class FolderBrowser:
-    def __init__(self, start_dir, ext_filters, show_hidden, on_file_selected, on_exit):
+    def __init__(self, start_dir, ext_filters, show_hidden, on_file_selected, on_exit, on_folder_selected=None):
+        """
+        :param on_folder_selected: Called with the list of video files of the current
+                                   directory when the "Play folder" entry is chosen.
+        """
         self.current_dir = start_dir
         self.ext_filters = [e.lower() for e in ext_filters]  # Normalize extensions to lowercase
         self.show_hidden = show_hidden
         self.on_file_selected = on_file_selected
+        self.on_folder_selected = on_folder_selected
         self.on_exit = on_exit
+        self.play_folder_index = None  # Position of the "Play folder" entry, if shown
 
         self.file_list = []
         self.header = urwid.Text("File Browser (Esc to exit, Enter to select)", align='center')
@@ -25,13 +34,15 @@ class FolderBrowser:
         self.listbox = urwid.ListBox(self.list_walker)
         self.main_view = urwid.Frame(header=self.header, body=self.listbox, footer=self.footer, focus_part='body')
 
-        self.update_file_list()
+        with metrics.timer("seeknob_directory_scan_seconds"):
+            self.update_file_list()
 
     def update_file_list(self):
         """Refresh the file list based on filters and visibility settings."""
         try:
             items = os.listdir(self.current_dir)
             self.file_list = [".."]  # Always include parent directory
+            has_videos = False
 
             for item in sorted(items):
                 if not self.show_hidden and item.startswith("."):
@@ -42,13 +53,21 @@ class FolderBrowser:
                     _, ext = os.path.splitext(item)
                     if ext.lower()[1:] not in self.ext_filters:  # Filter extensions
                         continue
+                    has_videos = True
                 self.file_list.append(item)
 
             self.list_walker.clear()
 
-            for item in self.file_list:
+            self.play_folder_index = None
+            if self.on_folder_selected and has_videos:
+                self.play_folder_index = 1
+                self.file_list.insert(1, PLAY_FOLDER_LABEL)
+
+            for index, item in enumerate(self.file_list):
                 full_path = os.path.join(self.current_dir, item)
-                if os.path.isdir(full_path):
+                if index == self.play_folder_index:
+                    display_text = ("folder", f"      {PLAY_FOLDER_LABEL}")
+                elif os.path.isdir(full_path):
                     display_text = ("folder", f"[DIR] {item}")
                 else:
                     display_text = f"      {item}"
@@ -62,6 +81,17 @@ class FolderBrowser:
             self.footer.set_text(f"Error: {e}")
 
 
+    def video_files(self):
+        """Return the full paths of the listed video files, in listing order."""
+        files = []
+        for index, item in enumerate(self.file_list):
+            if index == 0 or index == self.play_folder_index:
+                continue
+            full_path = os.path.join(self.current_dir, item)
+            if os.path.isfile(full_path):
+                files.append(full_path)
+        return files
+
     def update_file_list_old_working(self):
         try:
             self.file_list = [".."] + [f for f in sorted(os.listdir(self.current_dir)) if not f.startswith(".")]
@@ -89,12 +119,16 @@ class FolderBrowser:
             return None
         if key == 'enter':
             focus_index = self.listbox.focus_position
+            if focus_index == self.play_folder_index:
+                self.on_folder_selected(self.video_files())
+                return None
             selected_item = self.file_list[focus_index]
             path = os.path.join(self.current_dir, selected_item)
 
             if os.path.isdir(path):
                 self.current_dir = path
-                self.update_file_list()
+                with metrics.timer("seeknob_directory_scan_seconds"):
+                    self.update_file_list()
                 self.listbox.focus_position = 0
             else:
                 self.on_file_selected(path)
@@ -20,6 +20,7 @@ class HelpPage(urwid.WidgetWrap):
             "How to Use:\n\n"
             "1. Main Menu:\n"
             "   - 'Select File From Filesystem': Browse files and select a video to play.\n"
+            "   - 'Recent': Play a recently played file again, from where you stopped.\n"
             "   - 'Help': Show this help screen.\n"
             "   - 'About': Information about the application.\n"
             "   - 'Quit': Exit the program cleanly.\n\n"
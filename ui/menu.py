@@ -13,8 +13,9 @@ def menu_button(label, on_press_callback):
     return urwid.AttrMap(MenuItem(label, on_press_callback), None, focus_map='focus')
 
 class Menu(urwid.WidgetWrap):
-    def __init__(self, on_select_file, on_help, on_about, on_quit, mpv_manager):
+    def __init__(self, on_select_file, on_help, on_about, on_quit, mpv_manager, on_recent=None):
         self.on_select_file = on_select_file
+        self.on_recent = on_recent
         self.on_help = on_help
         self.on_about = on_about
         self.on_quit = on_quit
@@ -22,6 +23,10 @@ class Menu(urwid.WidgetWrap):
 
         menu_items = [
             menu_button("Select File From Filesystem", lambda _: self.on_select_file()),
+        ]
+        if self.on_recent:
+            menu_items.append(menu_button("Recent", lambda _: self.on_recent()))
+        menu_items += [
             menu_button("Help", lambda _: self.on_help()),
             menu_button("About", lambda _: self.on_about()),
             menu_button("Quit", lambda _: self.on_quit())
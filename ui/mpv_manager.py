@@ -2,49 +2,163 @@ import subprocess
 import socket
 import json
 import os
+import itertools
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
 from debug_logger import Debug
+from metrics import metrics
 
 debug = Debug()  # Initialize Debug logger
 
+# Built-in performance profiles. A "mpv_profiles" entry in config.json
+# replaces or adds profiles by name.
+DEFAULT_PROFILES = {
+    # Small cache without a seekable back-buffer: backward seeks re-read from disk.
+    "low-memory": {
+        "cache_mb": 32,
+        "back_buffer_mb": 8,
+        "seekable_cache": "False",
+        "hr_seek": "yes",
+        "hr_seek_demuxer_offset": 0,
+        "hr_seek_framedrop": "yes"
+    },
+    # Large back-buffer and frame-exact seeks, dropping frames to get there fast.
+    "scrub": {
+        "cache_mb": 128,
+        "back_buffer_mb": 384,
+        "seekable_cache": "True",
+        "hr_seek": "yes",
+        "hr_seek_demuxer_offset": 0,
+        "hr_seek_framedrop": "yes"
+    },
+    # Long read-ahead for slow storage; exact seeks start 1.5 s early and decode
+    # every frame, which stays correct on files with broken timestamps.
+    "archive": {
+        "cache_mb": 768,
+        "back_buffer_mb": 128,
+        "seekable_cache": "True",
+        "hr_seek": "yes",
+        "hr_seek_demuxer_offset": 1.5,
+        "hr_seek_framedrop": "no"
+    }
+}
+
+# Properties pushed by MPV through 'observe_property' for the status panel
+OBSERVED_PROPERTIES = ("time-pos", "duration", "pause", "path")
+
+def build_profile_options(profile, ram_budget_mb=None):
+    """
+    Translate a performance profile into MPV options.
+    The forward cache and the back-buffer are scaled down together when
+    their sum exceeds the RAM budget.
+    :param profile: Profile dictionary from config.json.
+    :param ram_budget_mb: Maximum demuxer cache size in MiB (None for no limit).
+    :return: Dictionary of MPV option names to values.
+    """
+    cache_mb = int(profile.get("cache_mb", 150))
+    back_mb = int(profile.get("back_buffer_mb", 50))
+    if ram_budget_mb and cache_mb + back_mb > ram_budget_mb:
+        scale = ram_budget_mb / (cache_mb + back_mb)
+        cache_mb = max(1, int(cache_mb * scale))
+        back_mb = int(back_mb * scale)
+
+    seekable = str(profile.get("seekable_cache", "False")).lower() == "true"
+    return {
+        "cache": "yes",
+        "demuxer-max-bytes": f"{cache_mb}MiB",
+        "demuxer-max-back-bytes": f"{back_mb}MiB",
+        "demuxer-seekable-cache": "yes" if seekable else "no",
+        "hr-seek": str(profile.get("hr_seek", "yes")),
+        "hr-seek-demuxer-offset": str(profile.get("hr_seek_demuxer_offset", 0)),
+        "hr-seek-framedrop": str(profile.get("hr_seek_framedrop", "yes"))
+    }
+
 class MPVManager:
-    def __init__(self, video_file, socket_path, full_screen, fs_screen):
+    def __init__(self, video_file, socket_path, full_screen, fs_screen,
+                 profiles=None, profile=None, ram_budget_mb=None, command_queue_size=64):
         """
         MPV Manager to handle video playback.
         :param video_file: Path to the video file.
         :param socket_path: Path for the MPV IPC socket.
         :param full_screen: Whether to launch MPV in fullscreen mode.
+        :param profiles: Performance profiles (cache and seek settings) replacing or extending DEFAULT_PROFILES.
+        :param profile: Name of the profile used when MPV starts.
+        :param ram_budget_mb: Upper limit for the demuxer cache of any profile.
+        :param command_queue_size: Maximum number of commands waiting to be sent.
         """
         self.video_file = video_file
         self.socket_path = socket_path
         self.full_screen = full_screen  # Initialize full_screen attribute
         self.fs_screen = fs_screen  # New parameter for screen selection
+        self.profiles = dict(DEFAULT_PROFILES, **(profiles or {}))
+        self.profile = profile if profile in self.profiles else next(iter(self.profiles))
+        self.ram_budget_mb = ram_budget_mb
         self.process = None
+        self.playlist = []  # Files queued after video_file when playing a folder
+        # Called as file_listener(path, previous) when MPV moves to another playlist entry,
+        # 'previous' being the last properties of the file it left, with its 'path'
+        self.file_listener = None
+        self.file_changes = queue.Queue()  # File changes waiting for file_listener
+        self.file_worker = None
+        self.playing_file = None  # File loaded by the running MPV process
+        self.properties = {}  # Latest values of OBSERVED_PROPERTIES
+        self.property_listener = None  # Called with the property name on every change
 
-    def start_mpv(self):
-        """Start MPV"""
+        # Command pipeline: callers queue commands, a writer thread sends them in batches
+        self.max_pending = command_queue_size
+        self.pending = deque()  # (message, future) pairs waiting to be written
+        self.pending_lock = threading.Condition()
+        self.replies = {}  # request_id -> Future
+        self.request_ids = itertools.count(1)
+        self.connection = None
+        self.connection_lost = False  # True from a dropped connection until it is re-established
+
+    def profile_options(self, name=None):
+        """Return the MPV options for the given (or active) profile."""
+        profile = self.profiles[name or self.profile]
+        return build_profile_options(profile, self.ram_budget_mb)
+
+    def start_mpv(self, start=None):
+        """
+        Start MPV.
+        :param start: Position in seconds to start playback from. MPV opens the
+                      file directly at this point instead of seeking after load.
+        """
         if not self.video_file:
             debug.log("No video file selected.")
             return
 
         if self.is_running():  # Check if MPV is already running
-            self.quit_mpv()
+            self.quit_mpv(timeout=2)  # Release the IPC socket before relaunching
 
-        mpv_command = [
-            "mpv",
-            self.video_file,
-            f"--input-ipc-server={self.socket_path}"
-        ]
+        mpv_command = ["mpv"]
+        if start:
+            # Per-file option group: only the first file resumes at 'start'
+            mpv_command += ["--{", f"--start={start:.3f}", self.video_file, "--}"]
+        else:
+            mpv_command.append(self.video_file)
+        mpv_command.append(f"--input-ipc-server={self.socket_path}")
+
+        if self.playlist:
+            following = self.playlist[self.playlist.index(self.video_file) + 1:] if self.video_file in self.playlist else []
+            mpv_command += following
+            mpv_command.append("--prefetch-playlist=yes")  # Demux the next file before it is needed
 
         if self.full_screen:
             mpv_command.append("--fs")  # Launch in fullscreen mode
             mpv_command.append(f"--fs-screen={self.fs_screen}")  # Specify fullscreen monitor
 
-        # Add high-resolution seek for smoother seeking
-        mpv_command.append("--hr-seek=yes")  # Enable frame-accurate seeking
-        mpv_command.append("--hr-seek-demuxer-offset=0")  # Start decoding as close as possible
+        # Cache and seek behaviour come from the active performance profile
+        for option, value in self.profile_options().items():
+            mpv_command.append(f"--{option}={value}")
         mpv_command.append("--hwdec=auto")  # Enable hardware acceleration
 
         debug.log(f"Launching MPV: {' '.join(mpv_command)}")
+        self.properties = {}
+        self.playing_file = self.video_file
 
         try:
             self.process = subprocess.Popen(
@@ -54,15 +168,297 @@ class MPVManager:
             )
         except Exception as e:
             debug.log_exception(e)
+            return
 
-    def send_command(self, command):
-        """Send a JSON command to MPV via the IPC socket."""
-        try:
-            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        metrics.inc("seeknob_mpv_starts_total")
+        self.start_ipc(self.process)
+
+    def start_ipc(self, process):
+        """
+        Open the IPC connection of an MPV process in the background.
+        A reader thread handles replies and property events, and a writer thread
+        sends the queued commands in batches.
+        :param process: The MPV process the connection belongs to.
+        """
+        with self.pending_lock:
+            self.connection = None  # Detach the writer of the previous process
+            self.connection_lost = False  # Commands queue up while the new process starts
+            self.fail_pending(ConnectionError("MPV was restarted"))
+            self.pending_lock.notify_all()
+            if self.file_worker is None:
+                self.file_worker = threading.Thread(target=self.notify_file_changes, daemon=True)
+                self.file_worker.start()
+        threading.Thread(target=self.observe_properties, args=(process,), daemon=True).start()
+
+    def observe_properties(self, process):
+        """
+        Keep an IPC connection open, record property-change events and resolve
+        command replies. The connection is re-established if it drops while
+        MPV is still running. Runs until the given MPV process exits.
+        :param process: The MPV process this observer belongs to.
+        """
+        while True:
+            client = self.connect(process)
+            if client is None:
+                break
+            try:
+                self.read_messages(client)
+            except Exception as e:
+                metrics.inc("seeknob_ipc_failures_total")
+                debug.log_exception(e)
+            finally:
+                client.close()
+                with self.pending_lock:
+                    if self.connection is client:
+                        metrics.set("seeknob_mpv_running", 0)
+                        self.connection = None
+                        self.connection_lost = True
+                        self.fail_pending(ConnectionError("MPV IPC connection closed"))
+                    self.pending_lock.notify_all()
+            if process is not self.process or process.poll() is not None:
+                break
+            debug.log("MPV IPC connection lost, reconnecting.")
+            time.sleep(0.05)
+
+        if process is self.process and self.property_listener:
+            self.property_listener(None)
+
+    def connect(self, process):
+        """
+        Connect to the IPC socket of an MPV process and start its writer thread.
+        :return: The connected socket, or None if the process exited or was replaced.
+        """
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Wait for MPV to create the IPC socket
+        while True:
+            try:
                 client.connect(self.socket_path)
-                client.sendall((json.dumps(command) + "\n").encode("utf-8"))
-        except Exception as e:
-            debug.log_exception(e)            
+                break
+            except OSError:
+                if process.poll() is not None or process is not self.process:
+                    client.close()
+                    return None
+                time.sleep(0.05)
+
+        with self.pending_lock:
+            if process is not self.process:
+                client.close()
+                return None
+            self.connection = client
+            self.connection_lost = False
+            metrics.set("seeknob_mpv_running", 1)
+            # Observations go first, ahead of anything queued while connecting
+            for i, name in reversed(list(enumerate(OBSERVED_PROPERTIES, start=1))):
+                self.pending.appendleft(({"command": ["observe_property", i, name]}, None))
+            self.pending_lock.notify_all()
+        threading.Thread(target=self.write_commands, args=(client,), daemon=True).start()
+        return client
+
+    def read_messages(self, client):
+        """Handle the messages of a connection until MPV closes it."""
+        buffer = b""
+        while True:
+            chunk = client.recv(65536)
+            if not chunk:
+                return
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                # A bad line (e.g. a path that is not valid UTF-8) must not end the connection
+                try:
+                    self.handle_message(json.loads(line.decode("utf-8", errors="replace")))
+                except Exception as e:
+                    debug.log_exception(f"Failed to handle MPV message {line[:200]!r}: {e}")
+
+    def handle_message(self, message):
+        """Resolve a command reply or record a property change."""
+        if "request_id" in message:
+            with self.pending_lock:
+                future = self.replies.pop(message["request_id"], None)
+            if future:
+                future.set_result(message)
+        elif message.get("event") == "property-change":
+            name, data = message["name"], message.get("data")
+            if name == "path":
+                if data and data != self.playing_file:
+                    self.change_file(data)
+                return
+            if data is None and name in ("time-pos", "duration"):
+                return  # Keep the last known values between files
+            self.properties[name] = data
+            if self.property_listener:
+                self.property_listener(name)
+
+    def write_commands(self, client):
+        """Send queued commands, packing everything queued so far into one write."""
+        while True:
+            with self.pending_lock:
+                while not self.pending and self.connection is client:
+                    self.pending_lock.wait()
+                if self.connection is not client:
+                    return
+                batch = list(self.pending)
+                self.pending.clear()
+
+            data = b"".join((json.dumps(message) + "\n").encode("utf-8") for message, _ in batch)
+            try:
+                client.sendall(data)
+                metrics.inc("seeknob_ipc_writes_total")
+                metrics.inc("seeknob_ipc_commands_total", len(batch))
+            except OSError as e:
+                metrics.inc("seeknob_ipc_failures_total")
+                debug.log_exception(e)
+                with self.pending_lock:
+                    for message, future in batch:
+                        self.fail_future(message, future, e)
+                try:
+                    client.shutdown(socket.SHUT_RDWR)  # Wake the reader so it reconnects
+                except OSError:
+                    pass
+                return
+
+    def fail_future(self, message, future, error):
+        """Resolve the future of a command that will never get a reply."""
+        if future:
+            self.replies.pop(message.get("request_id"), None)
+            future.set_exception(error)
+
+    def fail_pending(self, error):
+        """Drop the queued commands and fail every reply still awaited. Call with pending_lock held."""
+        self.pending.clear()
+        replies, self.replies = self.replies, {}
+        for future in replies.values():
+            future.set_exception(error)
+
+    def change_file(self, path):
+        """
+        Record that MPV moved to another playlist entry.
+        Runs on the IPC reader thread: file_listener is called from the file
+        worker, so hashing the new file never holds up replies and events.
+        """
+        debug.log(f"MPV is now playing '{path}'.")
+        previous = dict(self.properties, path=self.playing_file)
+        # The position of the previous file must not be taken for the new one
+        self.properties.pop("time-pos", None)
+        self.properties.pop("duration", None)
+        self.playing_file = path
+        self.video_file = path
+        self.file_changes.put((path, previous))
+        if self.property_listener:
+            self.property_listener("path")
+
+    def notify_file_changes(self):
+        """Call file_listener for each file change, in order."""
+        while True:
+            path, previous = self.file_changes.get()
+            try:
+                if self.file_listener:
+                    self.file_listener(path, previous)
+            except Exception as e:
+                debug.log_exception(e)
+
+    def send_command(self, command, reply=False):
+        """
+        Queue a JSON command for MPV without waiting for it to be sent.
+        Queued OSD messages are replaced by newer ones, queued property sets by
+        newer sets of the same property, and queued seeks by a newer absolute
+        seek; consecutive relative seeks are added up. When the queue is full,
+        the oldest OSD message is dropped, otherwise the new command is refused
+        ('quit' is always queued).
+        :param command: The command dictionary, e.g. {"command": ["cycle", "pause"]}.
+        :param reply: Return a Future resolved with MPV's reply.
+        :return: A concurrent.futures.Future if reply is True, otherwise None.
+        """
+        future = Future() if reply else None
+        message = dict(command)
+        with self.pending_lock:
+            if not self.is_running() or self.connection_lost:
+                metrics.inc("seeknob_ipc_dropped_total")
+                debug.log(f"MPV is not connected, command dropped: {command}")
+                if future:
+                    future.set_exception(ConnectionError("MPV is not connected"))
+                return future
+
+            if not future and self.coalesce(message):
+                return None
+            if (len(self.pending) >= self.max_pending and not self.drop_oldest_message()
+                    and message["command"][0] != "quit"):
+                metrics.inc("seeknob_ipc_dropped_total")
+                debug.log(f"MPV command queue full, command dropped: {command}")
+                if future:
+                    future.set_exception(BufferError("MPV command queue full"))
+                return future
+
+            if future:
+                message["request_id"] = next(self.request_ids)
+                self.replies[message["request_id"]] = future
+            self.pending.append((message, future))
+            self.pending_lock.notify_all()
+        return future
+
+    def coalesce(self, message):
+        """
+        Merge a new command with the queued ones. Call with pending_lock held.
+        :return: True if the command was folded into a queued one and must not be queued.
+        """
+        command = message["command"]
+        is_seek = lambda queued: queued[0] == "seek"
+        if command[0] == "seek" and command[2] == "relative":
+            if self.pending:
+                # A relative seek adds up with the seek queued right before it, so no knob detent is lost
+                last, future = self.pending[-1]
+                if not future and is_seek(last["command"]):
+                    target, flags = last["command"][1] + command[1], last["command"][2]
+                    if flags.startswith("absolute"):
+                        target = max(0, target)
+                    last["command"] = ["seek", target, flags]
+                    return True
+            return False
+        if command[0] == "seek":
+            superseded = is_seek  # An absolute seek makes every queued seek pointless
+        elif command[0] == "show_text":
+            superseded = lambda queued: queued[0] == "show_text"
+        elif command[0] == "set_property":
+            superseded = lambda queued: queued[0] == "set_property" and queued[1] == command[1]
+        else:
+            return False
+        self.pending = deque(
+            (queued, future) for queued, future in self.pending
+            if future or not superseded(queued["command"])
+        )
+        return False
+
+    def drop_oldest_message(self):
+        """Drop the oldest queued OSD message. Call with pending_lock held."""
+        for i, (message, future) in enumerate(self.pending):
+            if not future and message["command"][0] == "show_text":
+                del self.pending[i]
+                metrics.inc("seeknob_ipc_dropped_total")
+                debug.log(f"MPV command queue full, dropped: {message}")
+                return True
+        return False
+
+    def set_profile(self, name):
+        """
+        Switch to another performance profile.
+        If MPV is running, the new options are applied through IPC.
+        """
+        if name not in self.profiles:
+            debug.log(f"Unknown MPV profile '{name}'.")
+            return False
+        self.profile = name
+        if self.is_running():
+            for option, value in self.profile_options().items():
+                self.send_command({"command": ["set_property", option, value]})
+        debug.log(f"Switched MPV profile to '{name}'.")
+        return True
+
+    def cycle_profile(self):
+        """Switch to the next profile and return its name."""
+        names = list(self.profiles)
+        next_name = names[(names.index(self.profile) + 1) % len(names)]
+        self.set_profile(next_name)
+        return next_name
 
     def show_message(self, message, duration=2000):
         """Show a message on MPV."""
@@ -72,32 +468,65 @@ class MPVManager:
         """Seek in the video."""
         self.send_command({"command": ["seek", amount, "relative"]})
 
+    def seek_to(self, position, precision="exact"):
+        """
+        Seek to an absolute position.
+        :param position: Time in seconds.
+        :param precision: 'exact' for a frame-accurate seek, 'keyframes' for a fast seek.
+        """
+        self.send_command({"command": ["seek", position, f"absolute+{precision}"]})
+
+    def playlist_next(self):
+        """Skip to the next file of the playlist."""
+        self.send_command({"command": ["playlist-next", "weak"]})
+
+    def playlist_prev(self):
+        """Go back to the previous file of the playlist."""
+        self.send_command({"command": ["playlist-prev", "weak"]})
+
+    def next_file(self):
+        """Return the playlist entry after the playing file, or None."""
+        if self.playing_file in self.playlist:
+            index = self.playlist.index(self.playing_file) + 1
+            if index < len(self.playlist):
+                return self.playlist[index]
+        return None
+
     def toggle_pause(self):
         """Toggle play/pause."""
         self.send_command({"command": ["cycle", "pause"]})
 
-    def get_current_time(self):
-        """Get the current playback position."""
+    def get_current_time(self, timeout=1.0):
+        """
+        Get the current playback position.
+        Falls back to the last observed position if MPV does not answer in time.
+        Must not be called from the IPC reader thread (e.g. inside a listener).
+        """
+        future = self.send_command({"command": ["get_property", "time-pos"]}, reply=True)
         try:
-            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
-                client.connect(self.socket_path)
-                client.sendall((json.dumps({"command": ["get_property", "time-pos"]}) + "\n").encode("utf-8"))
-                response = client.recv(1024).decode("utf-8")
-                data = json.loads(response)
-                return data.get("data", 0)
+            return future.result(timeout=timeout).get("data") or 0
         except Exception as e:
             debug.log_exception(e)
-            return 0
+            return self.properties.get("time-pos") or 0
 
     def is_running(self):
         """Check if the MPV process is running."""
         return self.process and self.process.poll() is None
 
-    def quit_mpv(self):
-        """Send the 'quit' command to MPV via IPC socket."""
+    def quit_mpv(self, timeout=None):
+        """
+        Send the 'quit' command to MPV via IPC socket.
+        :param timeout: Wait up to this many seconds for MPV to exit, and kill it
+                        otherwise (the command is only queued when None).
+        """
         if self.is_running():  # Check if MPV is running
             try:
                 self.send_command({"command": ["quit"]})
                 debug.log("Sent 'quit' command to MPV.")
+                if timeout is not None:
+                    self.process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                debug.log("MPV did not quit in time, killing it.")
+                self.process.kill()
             except Exception as e:
-                debug.log_exception(e)
\ No newline at end of file
+                debug.log_exception(e)
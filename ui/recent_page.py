@@ -0,0 +1,50 @@
+import os
+import urwid
+from debug_logger import Debug
+from ui.folder_browser import SelectableText
+from ui.video_playing_page import format_time
+
+debug = Debug()  # Initialize Debug logger
+
+class RecentPage(urwid.WidgetWrap):
+    def __init__(self, entries, on_entry_selected, on_exit_callback):
+        """
+        List of recently played files.
+        :param entries: Recent file entries, most recent first (see RecentFiles).
+        :param on_entry_selected: Function called with the chosen entry.
+        :param on_exit_callback: Function to call when exiting back to the menu.
+        """
+        self.entries = entries
+        self.on_entry_selected = on_entry_selected
+        self.on_exit_callback = on_exit_callback
+
+        header = urwid.AttrMap(urwid.Text("Recent Files", align='center'), 'header')
+        if entries:
+            items = []
+            for entry in entries:
+                label = f"{os.path.basename(entry['path'])}  [{format_time(entry['position'])}]"
+                items.append(urwid.AttrMap(SelectableText(label), None, 'focus'))
+        else:
+            items = [urwid.Text("No recent files.", align='center')]
+        self.listbox = urwid.ListBox(urwid.SimpleFocusListWalker(items))
+        self.footer = urwid.Text("Enter to play, 'Esc' or 'q' to go back.", align='center')
+
+        content = urwid.Frame(header=header, body=self.listbox, footer=urwid.AttrMap(self.footer, 'footer'))
+        super().__init__(urwid.LineBox(content, title="Recent"))
+
+    def selectable(self):
+        return True
+
+    def keypress(self, size, key):
+        """Play the focused entry on Enter, return to the menu on Esc/q."""
+        if key in ('esc', 'q'):
+            debug.log("Esc or Q pressed. Returning to main menu.")
+            self.on_exit_callback()
+            return None
+        if key == 'enter':
+            if self.entries:
+                entry = self.entries[self.listbox.focus_position]
+                debug.log(f"Playing recent file '{entry['path']}'.")
+                self.on_entry_selected(entry)
+            return None
+        return super().keypress(size, key)
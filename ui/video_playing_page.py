@@ -1,35 +1,49 @@
 import os
+import time
 import urwid
 from debug_logger import Debug
 
 debug = Debug()  # Initialize Debug logger
 
+def format_time(seconds):
+    """Format seconds as HH:MM:SS.ss (or '--:--:--' when unknown)."""
+    if seconds is None:
+        return "--:--:--"
+    minutes, secs = divmod(max(0.0, seconds), 60)
+    hours, minutes = divmod(int(minutes), 60)
+    return f"{hours:02d}:{minutes:02d}:{secs:05.2f}"
+
 class VideoPlayingPage(urwid.WidgetWrap):
-    def __init__(self, mpv_manager, on_exit_callback):
+    def __init__(self, mpv_manager, on_exit_callback, input_handler=None, loop=None, refresh_rate=10):
         """
         Page displayed when a video is being played.
         :param mpv_manager: Instance of MPVManager to control MPV.
         :param on_exit_callback: Function to return to the main menu.
+        :param input_handler: InputHandler providing the seek step and markers.
+        :param loop: Urwid MainLoop used to schedule status panel repaints.
+        :param refresh_rate: Maximum status panel repaints per second.
         """
         self.mpv_manager = mpv_manager
         self.on_exit_callback = on_exit_callback
-
-        # Extract the file name from the full path
-        file_name = os.path.basename(self.mpv_manager.video_file)
+        self.input_handler = input_handler
+        self.loop = loop
+        self.refresh_interval = 1.0 / refresh_rate
+        self.last_refresh = 0.0
+        self.alarm = None
+        self.wake_fd = None
+        self.wake_pending = False
 
         # Page content
         header = urwid.Text("Video Playback", align='center')
-        body = urwid.Text(
-            f"{file_name}\n\nThe video is currently playing in the MPV player.\n\n"
-            "Press 'esc' or 'q' to stop the video and return to the main menu.",
-            align='center'
-        )
+        self.body = urwid.Text("", align='center')
+        self.status = urwid.Text("", align='center')
         footer = urwid.Text("SeeKnob - TheLabExpedition67", align='center')
 
         # Combine layout
         content = urwid.Pile([
             ('pack', urwid.AttrMap(header, 'header')),
-            ('weight', 1, urwid.Filler(body, valign='middle')),
+            ('weight', 1, urwid.Filler(self.body, valign='middle')),
+            ('pack', urwid.LineBox(self.status, title="Status")),
             ('pack', urwid.AttrMap(footer, 'footer'))
         ])
 
@@ -40,6 +54,92 @@ class VideoPlayingPage(urwid.WidgetWrap):
         # Use WidgetWrap
         super().__init__(wrapped_content)
 
+        self.update_body()
+        self.update_status()
+        if self.loop:
+            # Property events arrive on background threads; they only write to
+            # this pipe, and the repaint itself runs in the Urwid loop.
+            self.wake_fd = self.loop.watch_pipe(self.on_wake)
+            self.mpv_manager.property_listener = self.request_refresh
+            if self.input_handler:
+                self.input_handler.status_listener = self.request_refresh
+
+    def request_refresh(self, _source=None):
+        """Ask for a status repaint. Safe to call from any thread."""
+        if self.wake_fd is None or self.wake_pending:
+            return
+        self.wake_pending = True
+        try:
+            os.write(self.wake_fd, b"!")
+        except OSError:
+            pass
+
+    def on_wake(self, _data):
+        """Schedule a repaint, at most once per refresh interval."""
+        self.wake_pending = False
+        if self.alarm is None:
+            delay = max(0.0, self.last_refresh + self.refresh_interval - time.monotonic())
+            self.alarm = self.loop.set_alarm_in(delay, self.refresh)
+        return True  # Keep watching the pipe
+
+    def refresh(self, _loop=None, _data=None):
+        self.alarm = None
+        self.last_refresh = time.monotonic()
+        self.update_body()
+        self.update_status()
+
+    def update_body(self):
+        """Show the name of the playing file and its place in the playlist."""
+        video_file = self.mpv_manager.video_file
+        # Extract the file name from the full path
+        file_name = os.path.basename(video_file)
+        playlist = self.mpv_manager.playlist
+        if video_file in playlist:
+            file_name = f"{file_name}  ({playlist.index(video_file) + 1}/{len(playlist)})"
+        self.body.set_text(
+            f"{file_name}\n\nThe video is currently playing in the MPV player.\n\n"
+            "Press 'esc' or 'q' to stop the video and return to the main menu."
+        )
+
+    def update_status(self):
+        """Render position, duration, seek step, pause state and markers."""
+        properties = self.mpv_manager.properties
+        if not self.mpv_manager.is_running():
+            state = "Stopped"
+        elif properties.get("pause"):
+            state = "Paused"
+        else:
+            state = "Playing"
+
+        lines = [
+            f"{format_time(properties.get('time-pos'))} / {format_time(properties.get('duration'))}   [{state}]"
+        ]
+        if self.input_handler:
+            lines.append(
+                f"Seek Step: {self.input_handler.seek_step:.2f}s ({self.input_handler.seek_step_mode})"
+                f"   Profile: {self.mpv_manager.profile}"
+            )
+            markers = self.input_handler.marker_points
+            if markers:
+                lines.append("   ".join(f"M{key}: {format_time(markers[key])}" for key in sorted(markers)))
+            else:
+                lines.append("No markers set")
+        self.status.set_text("\n".join(lines))
+
+    def close(self):
+        """Stop receiving property events and cancel pending repaints."""
+        if self.mpv_manager.property_listener == self.request_refresh:
+            self.mpv_manager.property_listener = None
+        if self.input_handler and self.input_handler.status_listener == self.request_refresh:
+            self.input_handler.status_listener = None
+        if self.loop:
+            if self.alarm:
+                self.loop.remove_alarm(self.alarm)
+                self.alarm = None
+            if self.wake_fd is not None:
+                wake_fd, self.wake_fd = self.wake_fd, None
+                self.loop.remove_watch_pipe(wake_fd)
+
     def selectable(self):
         """Make the widget selectable to handle input."""
         return True
@@ -55,6 +155,7 @@ class VideoPlayingPage(urwid.WidgetWrap):
                 debug.log("MPV stopped via 'q' or 'esc' on VideoPlayingPage.")
             else:
                 debug.log("MPV was not running.")
+            self.close()
             self.on_exit_callback()  # Return to the menu
             return None  # Key handled
         return super().keypress(size, key)